@@ -1,24 +1,101 @@
 #!/usr/bin/env python3
 import sys
 import os
+import re
 import subprocess
 import argparse
-import tiktoken
-from typing import List, Optional, Union
+import contextlib
+import functools
+import hashlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Iterator, List, Optional, TextIO, Tuple, Union
+
+from codecontextcrafter.traverser.traverse_dependencies import ImportResolver, traverse_dependencies, clear_caches
+from codecontextcrafter.traverser.import_cache import ImportCache
+from codecontextcrafter.config_parser import parse_config_file, apply_config_defaults, validate_config
 
-from codecontextcrafter.aider.io import InputOutput
-from codecontextcrafter.aider.repomap import RepoMap
+# tiktoken and the RepoMap fork (tree-sitter, prompt_toolkit, rich) take most of
+# the import time; they are imported where signatures are generated instead
+if TYPE_CHECKING:
+    import tiktoken
+
+# Code block language for each primary file extension
+EXTENSION_LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+    '.java': 'java',
+    '.c': 'cpp',
+    '.cpp': 'cpp',
+    '.h': 'cpp',
+    '.hpp': 'cpp',
+}
+
+# Maximum number of token counts remembered by _count_tokens
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+# Token counts keyed by (digest, length) of the counted text, least recently used first;
+# the texts themselves (often whole repo maps) are not kept alive
+_TOKEN_COUNTS: "OrderedDict[Tuple[bytes, int], int]" = OrderedDict()
+
+# Minimum number of primary files before they are read ahead on worker threads
+PARALLEL_READ_MIN_FILES = 8
+
+# Maximum number of primary files read ahead of the one being written
+SOURCE_READ_AHEAD = 16
+
+# --find-by commands simple enough to run in-process: find <dir> -name '*.<ext>'
+_FIND_BY_NAME_PATTERN = re.compile(r"""^\s*find\s+([\w./-]+)\s+-name\s+(['"])\*(\.\w+)\2\s*$""")
+
+@functools.lru_cache(maxsize=4)
+def _get_encoding(name: str = "cl100k_base") -> "tiktoken.Encoding":
+    """
+    Load a tiktoken encoding once and reuse it for every call.
+
+    Args:
+        name: Name of the tiktoken encoding
+
+    Returns:
+        The cached Encoding instance
+    """
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def _count_tokens(text: str) -> int:
+    """
+    Count the tokens of a string, memoized so repeated snippets are tokenized once.
+
+    Args:
+        text: String to count
+
+    Returns:
+        Number of tokens in text
+    """
+    key = (hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest(), len(text))
+    count = _TOKEN_COUNTS.get(key)
+    if count is None:
+        count = len(_get_encoding().encode(text))
+        _TOKEN_COUNTS[key] = count
+        if len(_TOKEN_COUNTS) > TOKEN_COUNT_CACHE_SIZE:
+            _TOKEN_COUNTS.popitem(last=False)
+    else:
+        _TOKEN_COUNTS.move_to_end(key)
+    return count
 
-from codecontextcrafter.traverser.traverse_dependencies import traverse_dependencies
-from codecontextcrafter.config_parser import parse_config_file, apply_config_defaults, validate_config
 
 class DummyModel():
     def tokenizer(self, text):
-        return tiktoken.get_encoding("cl100k_base").encode(text)
+        return _get_encoding().encode(text)
 
     def token_count(self, messages):
         try:
-            return len(self.tokenizer(messages))
+            return _count_tokens(messages)
         except Exception as err:
             print(f"Unable to count tokens: {err}")
             return 0
@@ -130,9 +207,72 @@ def _create_argument_parser() -> argparse.ArgumentParser:
         action='store_true'
     )
 
+    parser.add_argument(
+        '-ic', '--import-cache',
+        dest='import_cache',
+        help=(
+            'Keep scanned imports in an on-disk cache ($XDG_CACHE_HOME/ccc, '
+            'default ~/.cache/ccc) '
+            'so unchanged files are not rescanned on later runs'
+        ),
+        action='store_true'
+    )
+
     return parser
 
 
+def _find_by_name_in_process(find_command: str) -> Optional[List[str]]:
+    """
+    Run a plain 'find <dir> -name "*.<ext>"' command without spawning a shell.
+
+    Args:
+        find_command: Shell command given with --find-by
+
+    Returns:
+        Paths in the order find would print them, or None if the command
+        is not of that form or the directory cannot be walked in-process
+    """
+    match = _FIND_BY_NAME_PATTERN.match(find_command)
+    if not match:
+        return None
+
+    root, suffix = match.group(1), match.group(3)
+    # find -P doesn't descend into a symlinked root, so leave that case to find
+    if os.path.islink(root) or not os.path.isdir(root):
+        return None
+
+    files = []
+    if os.path.basename(os.path.normpath(root)).endswith(suffix):
+        files.append(root)
+    try:
+        _walk_matching_names(root, suffix, files)
+    except OSError:
+        # Let find report unreadable directories the way it always has
+        return None
+    return files
+
+
+def _walk_matching_names(directory: str, suffix: str, files: List[str]) -> None:
+    """
+    Collect entries whose name ends with suffix, depth first like find.
+
+    Symlinked directories are listed but not followed.
+
+    Args:
+        directory: Directory to walk
+        suffix: File name suffix to match, e.g. '.py'
+        files: List the matching paths are appended to
+    """
+    with os.scandir(directory) as entries:
+        entries = list(entries)
+    for entry in entries:
+        path = os.path.join(directory, entry.name)
+        if entry.name.endswith(suffix):
+            files.append(path)
+        if entry.is_dir(follow_symlinks=False):
+            _walk_matching_names(path, suffix, files)
+
+
 def _collect_files_to_process(args, parser) -> List[str]:
     """
     Collect all files to process based on command-line arguments.
@@ -147,33 +287,40 @@ def _collect_files_to_process(args, parser) -> List[str]:
     to_be_processed = []
 
     if args.find_by:
-        try:
-            # Run shell cmd
-            result = subprocess.run(
-                args.find_by,
-                shell=True,
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            files = [f.strip() for f in result.stdout.splitlines() if f.strip()]
-
-            to_be_processed.extend(files)
-        except subprocess.CalledProcessError as error:
-            print(f"Error on find: {error}")
-            sys.exit(1)
+        files = _find_by_name_in_process(args.find_by)
+        if files is None:
+            try:
+                # Run shell cmd
+                result = subprocess.run(
+                    args.find_by,
+                    shell=True,
+                    check=True,
+                    capture_output=True,
+                    text=True
+                )
+                files = [f.strip() for f in result.stdout.splitlines() if f.strip()]
+            except subprocess.CalledProcessError as error:
+                print(f"Error on find: {error}")
+                sys.exit(1)
+
+        to_be_processed.extend(files)
 
     if args.files:
         to_be_processed.extend(args.files)
 
-    to_be_processed = list(dict.fromkeys(to_be_processed))
+    # Dedup the raw paths first (keeping order) so only survivors get resolved
+    seen = set()
+    to_be_processed = [f for f in to_be_processed if not (f in seen or seen.add(f))]
 
     if not to_be_processed:
         print("No files selected.")
         parser.print_help()
         sys.exit(1)
 
-    return [os.path.abspath(f) for f in to_be_processed]
+    # Same as os.path.abspath, without querying the cwd again for every path.
+    # Spellings of the same path (e.g. 'a.py' and './a.py') collapse here.
+    cwd = os.getcwd()
+    return list(dict.fromkeys(os.path.normpath(os.path.join(cwd, f)) for f in to_be_processed))
 
 
 def _resolve_file_dependencies(absolute_file_paths: List[str], args) -> tuple:
@@ -200,18 +347,29 @@ def _resolve_file_dependencies(absolute_file_paths: List[str], args) -> tuple:
         else:
             base_import_roots = None
 
-        discovered_dependencies = set()
-
-        for file_path in absolute_file_paths:
-            dependencies = traverse_dependencies(
-                file_path,
-                base_import_roots,
-                depth_max=args.dep_depth_max,
-                is_verbose=args.verbose
-            )
-            discovered_dependencies.update(dependencies)
-
-        signature_files = [dep for dep in discovered_dependencies if dep not in absolute_file_paths]
+        # Ordered like the traversal results, first primary file first
+        discovered_dependencies = {}
+
+        # Serial on purpose: traversals of different primary files share the
+        # in-process scan cache and this resolver, so overlapping dependency
+        # graphs are only scanned and resolved once
+        resolver = ImportResolver()
+        # One database connection for the whole run, written once at the end
+        cache_context = ImportCache() if getattr(args, 'import_cache', False) else contextlib.nullcontext()
+        with cache_context as import_cache:
+            for file_path in absolute_file_paths:
+                dependencies = traverse_dependencies(
+                    file_path,
+                    base_import_roots,
+                    depth_max=args.dep_depth_max,
+                    is_verbose=args.verbose,
+                    import_cache=import_cache,
+                    resolver=resolver
+                )
+                discovered_dependencies.update(dict.fromkeys(dependencies))
+
+        primary_file_set = set(absolute_file_paths)
+        signature_files = [dep for dep in discovered_dependencies if dep not in primary_file_set]
 
     else:
         primary_files = []
@@ -231,6 +389,9 @@ def _generate_code_signatures(signature_files: List[str], args) -> str:
     Returns:
         Generated signatures as string
     """
+    from codecontextcrafter.aider.io import InputOutput
+    from codecontextcrafter.aider.repomap import RepoMap
+
     print(f"Generating file signatures for {len(signature_files)} files...")
 
     # Set up token counter
@@ -258,68 +419,117 @@ def _generate_code_signatures(signature_files: List[str], args) -> str:
     return signatures
 
 
-def _format_output_prompt(primary_files: List[str], signatures: Optional[str], sig_only: bool) -> str:
+def _read_ahead(file_paths: List[str]) -> Iterator[str]:
+    """
+    Read source files on worker threads, yielding their contents in order.
+
+    At most SOURCE_READ_AHEAD files are read ahead of the consumer, which
+    bounds the memory held by contents not yet written out.
+
+    Args:
+        file_paths: Paths of the files to read
+
+    Returns:
+        Iterator over the file contents (or read error messages), in input order
+    """
+    remaining = iter(file_paths)
+    with ThreadPoolExecutor(max_workers=min(SOURCE_READ_AHEAD, (os.cpu_count() or 1) * 4)) as executor:
+        pending = deque(executor.submit(_read_source_file, path) for path in islice(remaining, SOURCE_READ_AHEAD))
+        while pending:
+            content = pending.popleft().result()
+            for path in islice(remaining, 1):
+                pending.append(executor.submit(_read_source_file, path))
+            yield content
+
+
+def _is_primary_file(output_path: str, primary_files: List[str]) -> bool:
     """
-    Format the final output prompt combining primary files and signatures.
+    Check whether the output path refers to one of the primary files.
 
     Args:
+        output_path: Output file path given with --output
+        primary_files: List of primary file paths
+
+    Returns:
+        True if writing the output would overwrite a primary file
+    """
+    output_path = os.path.realpath(output_path)
+    return any(os.path.realpath(file_path) == output_path for file_path in primary_files)
+
+
+def _write_prompt(out: TextIO, primary_files: List[str], signatures: Optional[str], sig_only: bool) -> None:
+    """
+    Write the final prompt combining primary files and signatures to a stream.
+
+    Primary files are read whole, one at a time, and written out as they are
+    read, so the whole prompt is never held in memory at once. Many primary
+    files are read ahead in parallel, with a bounded number in flight.
+
+    Args:
+        out: Text stream to write the markdown prompt to
         primary_files: List of primary file paths (full content)
         signatures: Generated signatures string
         sig_only: Whether in signatures-only mode
-
-    Returns:
-        Formatted prompt as markdown string
     """
-    prompt = "# Context\n\n"
+    out.write("# Context\n\n")
 
     # Add full content of primary files (skip if sig_only is True)
     if not sig_only and primary_files:
-        prompt += "## Primary Files (Full Content)\n\n"
-        for file_path in sorted(primary_files):
-            content = _read_source_file(file_path)
-
+        out.write("## Primary Files (Full Content)\n\n")
+        sorted_files = sorted(primary_files)
+        contents = _read_ahead(sorted_files) if len(sorted_files) >= PARALLEL_READ_MIN_FILES else None
+        for file_path in sorted_files:
             # Determine language for code block based on file extension
-            extension = os.path.splitext(file_path)[1].lower()
-            language = ''
-            if extension == '.py':
-                language = 'python'
-            elif extension in ['.js', '.jsx']:
-                language = 'javascript'
-            elif extension in ['.ts', '.tsx']:
-                language = 'typescript'
-            elif extension in ['.java']:
-                language = 'java'
-            elif extension in ['.c', '.cpp', '.h', '.hpp']:
-                language = 'cpp'
-
-            prompt += f"### {file_path}\n```{language}\n{content}\n```\n\n"
+            language = EXTENSION_LANGUAGES.get(os.path.splitext(file_path)[1].lower(), '')
+
+            out.write(f"### {file_path}\n```{language}\n")
+            out.write(_read_source_file(file_path) if contents is None else next(contents))
+            out.write("\n```\n\n")
 
     # Add signatures (for dependencies or all files if sig_only is True)
     if signatures:
         section_title = "File Signatures" if sig_only else "Dependencies (Signatures)"
-        prompt += f"## {section_title}\n\n"
-        prompt += signatures
+        out.write(f"## {section_title}\n\n")
+        out.write(signatures)
 
-    return prompt
 
-
-def _write_output(prompt: str, output_path: Optional[str]) -> None:
+def _stream_output(primary_files: List[str], signatures: Optional[str], sig_only: bool,
+                   output_path: Optional[str], *, stream: Optional[TextIO] = None) -> None:
     """
-    Write the generated prompt to file or stdout.
+    Write the final prompt directly to file or stdout as it is produced.
 
     Args:
-        prompt: The formatted prompt to output
+        primary_files: List of primary file paths (full content)
+        signatures: Generated signatures string
+        sig_only: Whether in signatures-only mode
         output_path: Output file path, or None for stdout
+        stream: Stream written to instead of stdout when output_path is None
     """
     if output_path:
         with open(output_path, 'w', encoding='utf-8') as output_file:
-            output_file.write(prompt)
+            _write_prompt(output_file, primary_files, signatures, sig_only)
         print(f"Prompt written to {output_path}")
     else:
-        print(prompt)
+        out = stream if stream is not None else sys.stdout
+        _write_prompt(out, primary_files, signatures, sig_only)
+        # Match print()'s trailing newline
+        out.write("\n")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_argument_parser() -> argparse.ArgumentParser:
+    """
+    Get the command-line argument parser, building it on first use.
+
+    parse_args() does not modify the parser, so one instance serves every run.
+
+    Returns:
+        Shared ArgumentParser instance
+    """
+    return _create_argument_parser()
 
 
-def ccc():
+def ccc(argv: Optional[List[str]] = None):
     """
     Main entry point for CodeContextCrafter CLI.
 
@@ -330,10 +540,28 @@ def ccc():
     4. Resolve dependencies
     5. Generate signatures
     6. Format and output the result
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
     """
     # Step 1: Parse arguments
-    parser = _create_argument_parser()
-    args = parser.parse_args()
+    parser = _get_argument_parser()
+    args = parser.parse_args(argv)
+
+    _run(args, parser)
+
+
+def _run(args, parser: argparse.ArgumentParser) -> None:
+    """
+    Run steps 2 to 6 of the workflow on already parsed arguments.
+
+    Args:
+        args: Parsed command-line arguments
+        parser: Argument parser (for help display if needed)
+    """
+    # Start every run with fresh token count and scanned import caches
+    _TOKEN_COUNTS.clear()
+    clear_caches()
 
     # Step 2: Load and apply config file
     # Auto-discover .ccc.conf in current directory if not explicitly specified
@@ -362,15 +590,17 @@ def ccc():
     # Step 3: Resolve dependencies
     primary_files, signature_files = _resolve_file_dependencies(absolute_file_paths, args)
 
+    # The output is opened for writing before primary files are read
+    if args.output and _is_primary_file(args.output, primary_files):
+        print(f"Error: output file {args.output} is one of the primary files", file=sys.stderr)
+        sys.exit(1)
+
     # Step 4: Generate signatures
     signatures = _generate_code_signatures(signature_files, args)
 
-    # Step 5: Format output prompt
+    # Step 5: Format and write output prompt
     print("Generating final prompt...")
-    prompt = _format_output_prompt(primary_files, signatures, args.sig_only)
-
-    # Step 6: Write output
-    _write_output(prompt, args.output)
+    _stream_output(primary_files, signatures, args.sig_only, args.output)
 
 
 def main():
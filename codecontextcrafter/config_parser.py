@@ -6,10 +6,124 @@ All command-line parameters can be specified in the config file.
 """
 
 import os
-from typing import Dict, List, Optional, Any
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
+
+# Parsed config files, keyed by (absolute path, mtime in ns, size)
+_CONFIG_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+# Config values converted to booleans, keyed by their lower-cased form
+_BOOLEAN_VALUES = {'true': True, 'false': False}
+
+# Mapping from config keys to argparse attribute names
+# Some may differ due to argparse conventions (e.g., dashes vs underscores)
+_CONFIG_ARGS = {
+    'root': 'root',
+    'dep_depth_max': 'dep_depth_max',
+    'sig_tokens': 'sig_tokens',
+    'output': 'output',
+    'sig_only': 'sig_only',
+    'verbose': 'verbose',
+    'find_by': 'find_by',
+    'import_cache': 'import_cache',
+}
+
+# Default value of each argument a config file can set
+_ARG_DEFAULTS = {
+    'root': None,
+    'dep_depth_max': None,
+    'sig_tokens': None,
+    'output': None,
+    'sig_only': False,
+    'verbose': False,
+    'find_by': None,
+    'import_cache': False,
+}
+
+# Marker for attributes missing from the argparse namespace
+_MISSING = object()
+
+
+@dataclass(slots=True, eq=False)
+class CCCConfig(Mapping):
+    """
+    Values read from a .ccc.conf file.
+
+    Known keys are typed attributes (config.dep_depth_max); a value of None
+    means the key was not in the file. Unknown keys are kept in extra.
+    The object is also a read-only mapping of the keys present in the file,
+    so config['root'], 'root' in config and config.items() keep working.
+    """
+    root: Optional[Union[str, List[str]]] = None
+    dep_depth_max: Optional[int] = None
+    sig_tokens: Optional[int] = None
+    output: Optional[str] = None
+    sig_only: Optional[bool] = None
+    verbose: Optional[bool] = None
+    find_by: Optional[str] = None
+    import_cache: Optional[bool] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'CCCConfig':
+        """
+        Build a config from parsed key/value pairs.
+
+        Args:
+            values: Dictionary as returned by _parse_config_stream()
+
+        Returns:
+            New config; lists in values are copied
+        """
+        known = {}
+        extra = {}
+        for key, value in values.items():
+            if isinstance(value, list):
+                value = list(value)
+            if key in _CONFIG_FIELDS:
+                known[key] = value
+            else:
+                extra[key] = value
+        return cls(**known, extra=extra)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the keys present in the config file as a plain dictionary.
+
+        Returns:
+            Dictionary of config key to value
+        """
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _CONFIG_FIELDS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        return self.extra[key]
 
+    def __contains__(self, key: object) -> bool:
+        if key in _CONFIG_FIELDS:
+            return getattr(self, key) is not None
+        return key in self.extra
 
-def parse_config_file(config_path: str) -> Dict[str, Any]:
+    def __iter__(self) -> Iterator[str]:
+        for key in _CONFIG_FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+# Config keys stored as CCCConfig attributes
+_CONFIG_FIELDS = tuple(f.name for f in fields(CCCConfig) if f.name != 'extra')
+
+
+def parse_config_file(config_path: str) -> CCCConfig:
     """
     Parse a .ccc.conf configuration file.
 
@@ -24,58 +138,85 @@ def parse_config_file(config_path: str) -> Dict[str, Any]:
         config_path: Path to the config file
 
     Returns:
-        Dictionary with config values. Keys with multiple values are stored as lists.
+        Config values. Keys with multiple values are stored as lists.
 
     Raises:
         FileNotFoundError: If config file doesn't exist
         ValueError: If config file has invalid format
     """
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"Config file not found: {config_path}")
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file not found: {config_path}") from None
 
+    # Unchanged files are served from the cache without being read again
+    cache_key = (os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+    config = _CONFIG_CACHE.get(cache_key)
+    if config is None:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = _parse_config_stream(f)
+        _CONFIG_CACHE[cache_key] = config
+
+    # Callers may modify the result (and its lists), so hand out a copy
+    return CCCConfig.from_dict(config)
+
+
+def _parse_config_stream(stream: Iterable[str]) -> Dict[str, Any]:
+    """
+    Parse .ccc.conf content from an open text stream.
+
+    Args:
+        stream: Text stream (or any iterable of lines) with config content
+
+    Returns:
+        Dictionary with config values. Keys with multiple values are stored as lists.
+
+    Raises:
+        ValueError: If the content has invalid format
+    """
     config: Dict[str, Any] = {}
 
-    with open(config_path, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            # Strip whitespace and skip empty lines or comments
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            # Parse key = value
-            if '=' not in line:
-                raise ValueError(
-                    f"Invalid config format at line {line_num}: '{line}'\n"
-                    f"Expected format: key = value"
-                )
-
-            key, value = line.split('=', 1)
-            key = key.strip()
-            value = value.strip()
-
-            if not key:
-                raise ValueError(f"Empty key at line {line_num}")
-
-            # Convert boolean strings
-            if value.lower() in ('true', 'false'):
-                value = value.lower() == 'true'
-            # Convert integer strings (for things like dep_depth_max, sig_tokens)
-            elif value.isdigit():
-                value = int(value)
-
-            # Handle multiple values for the same key (e.g., multiple root paths)
-            if key in config:
-                # Convert to list if not already
-                if not isinstance(config[key], list):
-                    config[key] = [config[key]]
-                config[key].append(value)
-            else:
-                config[key] = value
+    for line_num, line in enumerate(stream, 1):
+        # Strip whitespace and skip empty lines or comments
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        # Parse key = value
+        key, separator, value = line.partition('=')
+        if not separator:
+            raise ValueError(
+                f"Invalid config format at line {line_num}: '{line}'\n"
+                f"Expected format: key = value"
+            )
+
+        key = key.strip()
+        value = value.strip()
+
+        if not key:
+            raise ValueError(f"Empty key at line {line_num}")
+
+        # Convert boolean strings
+        boolean = _BOOLEAN_VALUES.get(value.lower())
+        if boolean is not None:
+            value = boolean
+        # Convert integer strings (for things like dep_depth_max, sig_tokens)
+        elif value.isdigit():
+            value = int(value)
+
+        # Handle multiple values for the same key (e.g., multiple root paths)
+        if key in config:
+            # Convert to list if not already
+            if not isinstance(config[key], list):
+                config[key] = [config[key]]
+            config[key].append(value)
+        else:
+            config[key] = value
 
     return config
 
 
-def apply_config_defaults(args, config: Dict[str, Any]) -> None:
+def apply_config_defaults(args, config: Mapping) -> None:
     """
     Apply config file values to argparse namespace.
 
@@ -84,47 +225,33 @@ def apply_config_defaults(args, config: Dict[str, Any]) -> None:
 
     Args:
         args: argparse.Namespace object with CLI arguments
-        config: Dictionary from parse_config_file()
+        config: Config from parse_config_file(), or a dictionary of config values
 
     Note:
         Modifies args in-place. CLI arguments always take precedence.
     """
-    # Mapping from config keys to argparse attribute names
-    # Some may differ due to argparse conventions (e.g., dashes vs underscores)
-    key_mapping = {
-        'root': 'root',
-        'dep_depth_max': 'dep_depth_max',
-        'sig_tokens': 'sig_tokens',
-        'output': 'output',
-        'sig_only': 'sig_only',
-        'verbose': 'verbose',
-        'find_by': 'find_by',
-    }
+    argd = vars(args)
+    updates = {}
 
     # Special handling for 'root' - can be single value or list
-    if 'root' in config and hasattr(args, 'root'):
-        # Only apply if root wasn't specified on CLI
-        # Check if it's the default value (None)
-        if args.root is None:
-            roots = config['root']
-            # If single root, keep as string; if multiple, convert to list
-            if isinstance(roots, list):
-                args.root = roots
-            else:
-                args.root = roots
+    # Only apply if root wasn't specified on CLI (still the default None)
+    if 'root' in config and argd.get('root', _MISSING) is None:
+        updates['root'] = config['root']
 
     # Apply other config values
-    for config_key, args_attr in key_mapping.items():
-        if config_key == 'root':
-            continue  # Already handled above
+    for config_key, args_attr in _CONFIG_ARGS.items():
+        if config_key == 'root' or config_key not in config:
+            continue  # Root already handled above
+
+        current_value = argd.get(args_attr, _MISSING)
+        if current_value is _MISSING:
+            continue
 
-        if config_key in config and hasattr(args, args_attr):
-            current_value = getattr(args, args_attr)
-            default_value = _get_default_value(args_attr)
+        # Only apply config if CLI arg is still at default value
+        if current_value is None or current_value == _ARG_DEFAULTS.get(args_attr):
+            updates[args_attr] = config[config_key]
 
-            # Only apply config if CLI arg is still at default value
-            if current_value == default_value or current_value is None:
-                setattr(args, args_attr, config[config_key])
+    argd.update(updates)
 
 
 def _get_default_value(arg_name: str) -> Any:
@@ -137,45 +264,89 @@ def _get_default_value(arg_name: str) -> Any:
     Returns:
         Default value for the argument
     """
-    defaults = {
-        'root': None,
-        'dep_depth_max': None,
-        'sig_tokens': None,
-        'output': None,
-        'sig_only': False,
-        'verbose': False,
-        'find_by': None,
-    }
-    return defaults.get(arg_name)
+    return _ARG_DEFAULTS.get(arg_name)
+
+
+def _validate_roots(key: str, value: Any) -> None:
+    """
+    Check that every configured root path exists.
+
+    Args:
+        key: Config key being validated
+        value: Single root path or list of root paths
+
+    Raises:
+        ValueError: If a root is not a path or does not exist
+    """
+    roots = value if isinstance(value, list) else [value]
+    checked = set()
+    for root in roots:
+        if not isinstance(root, str):
+            raise ValueError(f"{key} must be a path, got: {root}")
+        # Stat each distinct path once, however often it is listed
+        abs_root = os.path.abspath(root)
+        if abs_root in checked:
+            continue
+        checked.add(abs_root)
+
+        try:
+            os.stat(abs_root)
+        except (OSError, ValueError):
+            raise ValueError(f"Root path does not exist: {root}") from None
+
+
+def _validate_positive_int(key: str, value: Any) -> None:
+    """
+    Check that a config value is a non-negative integer.
+
+    Args:
+        key: Config key being validated
+        value: Parsed config value
+
+    Raises:
+        ValueError: If the value is not a non-negative integer
+    """
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"{key} must be a positive integer, got: {value}")
+
+
+def _validate_bool(key: str, value: Any) -> None:
+    """
+    Check that a config value is a boolean.
+
+    Args:
+        key: Config key being validated
+        value: Parsed config value
+
+    Raises:
+        ValueError: If the value is not a boolean
+    """
+    if not isinstance(value, bool):
+        raise ValueError(f"{key} must be true or false, got: {value}")
+
+
+# Validator for each config key that has constraints on its value
+_VALIDATORS: Dict[str, Callable[[str, Any], None]] = {
+    'root': _validate_roots,
+    'dep_depth_max': _validate_positive_int,
+    'sig_tokens': _validate_positive_int,
+    'sig_only': _validate_bool,
+    'verbose': _validate_bool,
+    'import_cache': _validate_bool,
+}
 
 
-def validate_config(config: Dict[str, Any]) -> None:
+def validate_config(config: Mapping) -> None:
     """
     Validate config file values.
 
     Args:
-        config: Dictionary from parse_config_file()
+        config: Config from parse_config_file(), or a dictionary of config values
 
     Raises:
         ValueError: If config contains invalid values
     """
-    # Validate root paths exist
-    if 'root' in config:
-        roots = config['root'] if isinstance(config['root'], list) else [config['root']]
-        for root in roots:
-            if not os.path.exists(root):
-                raise ValueError(f"Root path does not exist: {root}")
-
-    # Validate numeric values are positive
-    if 'dep_depth_max' in config:
-        if not isinstance(config['dep_depth_max'], int) or config['dep_depth_max'] < 0:
-            raise ValueError(f"dep_depth_max must be a positive integer, got: {config['dep_depth_max']}")
-
-    if 'sig_tokens' in config:
-        if not isinstance(config['sig_tokens'], int) or config['sig_tokens'] < 0:
-            raise ValueError(f"sig_tokens must be a positive integer, got: {config['sig_tokens']}")
-
-    # Validate boolean values
-    for bool_key in ['sig_only', 'verbose']:
-        if bool_key in config and not isinstance(config[bool_key], bool):
-            raise ValueError(f"{bool_key} must be true or false, got: {config[bool_key]}")
+    for key, value in config.items():
+        validator = _VALIDATORS.get(key)
+        if validator is not None:
+            validator(key, value)
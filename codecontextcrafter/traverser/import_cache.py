@@ -0,0 +1,154 @@
+"""
+Persistent on-disk cache of the imports found in source files.
+
+Used by traverse_dependencies when --import-cache is given, so repeated runs
+over the same repository skip scanning files that have not changed.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Location of the cache database below the user's cache directory
+IMPORT_CACHE_SUBPATH = os.path.join('ccc', 'imports.sqlite3')
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS imports ('
+    'abs_path TEXT PRIMARY KEY, '
+    'mtime_ns INTEGER, '
+    'size INTEGER, '
+    'sha1 BLOB, '
+    'imports BLOB)'
+)
+
+
+def default_import_cache_path() -> str:
+    """
+    Get the default location of the cache database.
+
+    Follows the XDG base directory spec: $XDG_CACHE_HOME if set to an
+    absolute path, ~/.cache otherwise.
+
+    Returns:
+        Path to the cache database file
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME', '')
+    if not os.path.isabs(cache_home):
+        cache_home = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, IMPORT_CACHE_SUBPATH)
+
+
+class CachedImports(NamedTuple):
+    """A stored scan result and the file state it was computed for."""
+    mtime_ns: int
+    size: int
+    sha1: bytes
+    imports: frozenset
+
+
+class ImportCache:
+    """
+    SQLite-backed map of absolute file path to the imports found in it.
+
+    Safe to use from several threads, which share one connection. Stored
+    entries are buffered and written in one transaction by flush() or
+    close(), instead of one commit per file.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            db_path: Path to the SQLite database file (None for the default
+                     location, see default_import_cache_path())
+        """
+        self.db_path = db_path if db_path is not None else default_import_cache_path()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[str, int, int, bytes, bytes]] = {}
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Used by whichever thread holds _lock
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def get(self, abs_path: str) -> Optional[CachedImports]:
+        """
+        Look up the stored scan result of a file.
+
+        Args:
+            abs_path: Absolute path of the file
+
+        Returns:
+            The stored entry, or None if the file has not been cached
+        """
+        with self._lock:
+            row = self._pending.get(abs_path)
+            if row is not None:
+                row = row[1:]
+            else:
+                row = self._conn.execute(
+                    'SELECT mtime_ns, size, sha1, imports FROM imports WHERE abs_path = ?',
+                    (abs_path,)
+                ).fetchone()
+        if row is None:
+            return None
+
+        mtime_ns, size, sha1, imports = row
+        names = bytes(imports).decode('utf-8').split('\n') if imports else []
+        return CachedImports(mtime_ns, size, bytes(sha1), frozenset(names))
+
+    def put(self, abs_path: str, mtime_ns: int, size: int, sha1: bytes, imports: frozenset) -> None:
+        """
+        Store the scan result of a file, replacing any previous entry.
+
+        The entry is visible to get() right away and written on flush().
+
+        Args:
+            abs_path: Absolute path of the file
+            mtime_ns: Modification time of the scanned content in nanoseconds
+            size: Size of the scanned content in bytes
+            sha1: SHA-1 digest of the scanned content
+            imports: Import names found in the content
+        """
+        encoded = '\n'.join(sorted(imports)).encode('utf-8')
+        with self._lock:
+            self._pending[abs_path] = (abs_path, mtime_ns, size, sha1, encoded)
+
+    def flush(self) -> None:
+        """
+        Write all buffered entries in a single transaction.
+        """
+        with self._lock:
+            rows, self._pending = list(self._pending.values()), {}
+            if not rows:
+                return
+
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT INTO imports (abs_path, mtime_ns, size, sha1, imports) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(abs_path) DO UPDATE SET '
+                    'mtime_ns = excluded.mtime_ns, size = excluded.size, '
+                    'sha1 = excluded.sha1, imports = excluded.imports',
+                    rows
+                )
+
+    def close(self) -> None:
+        """
+        Flush buffered entries and close the connection.
+
+        Call once no other thread uses the cache anymore.
+        """
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> 'ImportCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,25 +1,125 @@
 import re
 import os
-from typing import List, Optional, Any
+import atexit
+import contextlib
+import functools
+import hashlib
+import mmap
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Any, Tuple, Union
+
+from codecontextcrafter.traverser.import_cache import CachedImports, ImportCache
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# multiprocessing and the process pool are only needed for large BFS levels;
+# they are imported on first use instead
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
 
 # Supported file extensions for dependency scanning
 EXTENSIONS = ['py', 'js', 'mjs', 'ts', 'java', 'json']
 
-# Regex patterns for extracting imports from different languages
-PYTHON_IMPORT_PATTERN = r'^\s*import\s+([^\n#;/]+)'
-PYTHON_FROM_IMPORT_PATTERN = r'^\s*from\s+([a-zA-Z0-9_.]+)\s+import'
-JAVA_IMPORT_PATTERN = r'^\s*import\s+((?:[a-zA-Z_][\w]*\.)+[A-Za-z_][\w]*)\s*;'
-JAVA_STATIC_IMPORT_PATTERN = r'^\s*import\s+static\s+((?:[a-zA-Z_][\w]*\.)+[A-Za-z_][\w]*)\.[A-Za-z_][\w]*\s*;'
-typescript_imports_PATTERN = r'^\s*import(?:\s+type)?\s+(?:{[^}]*}|\*\s+as\s+\w+|\w+)?(?:\s+from)?\s*[\'"]([^\'"]+)["\']'
-javascript_imports_PATTERN = r'require\s*\(\s*[\'"]([^\'"]+)["\']\s*\)'
-
-def relative_to_absolute(base_paths: List[str], import_path: str) -> Optional[str]:
+# Resolvable file extensions that are never scanned for imports themselves
+UNSCANNED_EXTENSIONS = ('.json',)
+
+# Worker threads used to read and scan the files of one BFS level
+MAX_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# BFS levels whose files add up to more than this (in bytes) are scanned in
+# worker processes instead, since the regex scan holds the GIL
+PROCESS_SCAN_MIN_BYTES = 8 * 1024 * 1024
+
+# Files larger than this (in bytes) are memory-mapped instead of read
+MMAP_MIN_SIZE = 64 * 1024
+
+# Regex of each import style, with exactly one capturing group for the name.
+# The line-anchored ones start with '^[^\S\n]*': it matches the same imports
+# as '^\s*' but doesn't rescan runs of blank lines from every line start.
+#   python:      import a, b.c
+#   python_from: from a.b import c
+#   java:        import a.b.C;
+#   java_static: import static a.b.C.member;
+#   typescript:  import x from './y', import './y', import type {..} from './y'
+#                (the whitespace before the clause is only '\s+', so it can't
+#                backtrack quadratically against a following '\s*')
+#   javascript:  require('./y')  (anywhere in a line)
+IMPORT_PATTERNS = [
+    ('python', r'^[^\S\n]*import\s+([^\n#;/]+)'),
+    ('python_from', r'^[^\S\n]*from\s+([a-zA-Z0-9_.]+)\s+import'),
+    ('java', r'^[^\S\n]*import\s+((?:[a-zA-Z_][\w]*\.)+[A-Za-z_][\w]*)\s*;'),
+    ('java_static', r'^[^\S\n]*import\s+static\s+((?:[a-zA-Z_][\w]*\.)+[A-Za-z_][\w]*)\.[A-Za-z_][\w]*\s*;'),
+    ('typescript',
+     r'^[^\S\n]*import(?:\s+type)?\s+(?:(?:{[^}]*}|\*\s+as\s+\w+|\w+)(?:\s+from)?\s*)?[\'"]([^\'"]+)["\']'),
+    ('javascript', r'require\s*\(\s*[\'"]([^\'"]+)["\']\s*\)'),
+]
+
+# All styles fused into one regex, so a single match attempt per candidate
+# start tries every style. Each style sits in an optional lookahead named by
+# its kind: the attempt always succeeds without consuming text and reports
+# every style matching there, so a line can count for several styles (e.g.
+# 'import x' followed by a require() on the same line).
+IMPORT_PATTERN = ''.join(f'(?:(?=(?P<{kind}>{pattern}))|)' for kind, pattern in IMPORT_PATTERNS)
+
+_IMPORT_RE = re.compile(IMPORT_PATTERN, re.MULTILINE)
+# Bytes variant for raw file contents: the pattern is ASCII-only, so files
+# are scanned without decoding and only the captured names get decoded
+_IMPORT_RE_BYTES = re.compile(IMPORT_PATTERN.encode('ascii'), re.MULTILINE)
+
+# (kind, index of the style's group) pairs; its name is the group after it
+_IMPORT_GROUPS = [(kind, _IMPORT_RE.groupindex[kind]) for kind, _ in IMPORT_PATTERNS]
+
+# Single-style regexes, for the rare starts inside a previous multi-line match
+_STYLE_RES = [re.compile(pattern, re.MULTILINE) for _, pattern in IMPORT_PATTERNS]
+_STYLE_RES_BYTES = [re.compile(pattern.encode('ascii'), re.MULTILINE) for _, pattern in IMPORT_PATTERNS]
+
+# Import keywords, and which of them start a match at their line's start
+# rather than at their own position
+_KEYWORDS = ('import', 'from', 'require')
+_LINE_KEYWORDS = ('import', 'from')
+
+# Optional Hyperscan prefilter locating the candidate starts in one SIMD scan,
+# so the Python regex only runs there. Without it the keywords are located
+# with str/bytes find() instead.
+PREFILTER_PATTERNS = [rb'^[^\S\n]*(?:import|from)\s', rb'require\s*\(']
+
+if hyperscan is not None:
+    _PREFILTER_DB = hyperscan.Database()
+    _PREFILTER_DB.compile(
+        expressions=PREFILTER_PATTERNS,
+        ids=list(range(len(PREFILTER_PATTERNS))),
+        elements=len(PREFILTER_PATTERNS),
+        flags=[hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(PREFILTER_PATTERNS)
+    )
+else:
+    _PREFILTER_DB = None
+
+# Hyperscan scratch space can't be shared between threads scanning concurrently
+_prefilter_local = threading.local()
+
+# Worker process pool for large BFS levels, created on first use
+_process_pool: Optional['ProcessPoolExecutor'] = None
+_process_pool_lock = threading.Lock()
+
+
+def relative_to_absolute(
+    base_paths: List[str],
+    import_path: str,
+    resolver: Optional['ImportResolver'] = None
+) -> Optional[str]:
     """
     Resolve an import path to an absolute file path by trying multiple base paths.
 
     Args:
         base_paths: List of base directories to try (in order)
         import_path: Import path to resolve (e.g., "package.module" or "./relative")
+        resolver: Resolver whose cached results to reuse (None to resolve afresh)
 
     Returns:
         Absolute path to the resolved file, or None if not found
@@ -28,45 +128,294 @@ def relative_to_absolute(base_paths: List[str], import_path: str) -> Optional[st
     if isinstance(base_paths, str):
         base_paths = [base_paths]
 
-    path_import = import_path if import_path.startswith(('/', './', '../')) else import_path.replace('.', '/')
+    if resolver is None:
+        resolver = ImportResolver()
+    return resolver.resolve(tuple(base_paths), import_path)
+
+
+class ImportResolver:
+    """
+    Resolves import paths to files, remembering every result.
+
+    Meant for one run: results and the directory listings they are probed
+    against reflect the filesystem when first looked up, so files added or
+    removed later are only seen by a new resolver. Relative base paths are
+    resolved against the cwd at that time.
+    """
+
+    def __init__(self):
+        """
+        Create a resolver with nothing resolved or listed yet.
+        """
+        self._resolved: Dict[Tuple[Tuple[str, ...], str], Optional[str]] = {}
+        self._listings: Dict[str, Dict[str, bool]] = {}
+
+    def resolve(self, base_paths: Tuple[str, ...], import_path: str) -> Optional[str]:
+        """
+        Resolve an import path, reusing an earlier result for the same arguments.
+
+        Args:
+            base_paths: Base directories to try (in order)
+            import_path: Import path to resolve
+
+        Returns:
+            Absolute path to the resolved file, or None if not found
+        """
+        key = (base_paths, import_path)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            resolved = self._resolved[key] = self._resolve_uncached(base_paths, import_path)
+            return resolved
+
+    def _resolve_uncached(self, base_paths: Tuple[str, ...], import_path: str) -> Optional[str]:
+        """
+        Resolve an import path against the (cached) directory listings.
+
+        Args:
+            base_paths: Base directories to try (in order)
+            import_path: Import path to resolve
+
+        Returns:
+            Absolute path to the resolved file, or None if not found
+        """
+        path_import = import_path if import_path.startswith(('/', './', '../')) else import_path.replace('.', '/')
+
+        # Try each base path in order
+        for base_path in base_paths:
+            path_candidate_basename = os.path.normpath(os.path.join(base_path, path_import))
+            candidate_dir, candidate_name = os.path.split(path_candidate_basename)
+
+            # Probe names against one cached listing instead of stat'ing each candidate
+            entries = self._dir_entries(candidate_dir or os.curdir)
+            possible_names = [candidate_name] + [f'{candidate_name}.{ext}' for ext in EXTENSIONS]
+
+            for possible_name in possible_names:
+                # The listing also holds directories; only accept files
+                if entries.get(possible_name) is True:
+                    possible_path = os.path.join(candidate_dir, possible_name)
+                    # Already normalized; only relative base paths need the cwd
+                    return possible_path if os.path.isabs(possible_path) else os.path.abspath(possible_path)
+
+        return None
+
+    def _dir_entries(self, dir_path: str) -> Dict[str, bool]:
+        """
+        List the names in a directory and whether each is a file, cached.
+
+        DirEntry.is_file() answers from the directory entry type scandir
+        already fetched, so only symlinks need an extra stat.
+
+        Args:
+            dir_path: Directory to list
+
+        Returns:
+            Mapping of entry name to whether it is a (symlink to a) file,
+            empty if the directory can't be listed
+        """
+        entries = self._listings.get(dir_path)
+        if entries is None:
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = {entry.name: _is_file(entry) for entry in it}
+            except OSError:
+                entries = {}
+            self._listings[dir_path] = entries
+        return entries
+
+
+def _is_file(entry: os.DirEntry) -> bool:
+    """
+    Check whether a directory entry is a file, treating stat errors as not.
+
+    Args:
+        entry: Entry returned by os.scandir()
+
+    Returns:
+        True if the entry is a file or a symlink to one
+    """
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+def clear_caches() -> None:
+    """
+    Drop scanned imports.
+
+    Entries are keyed by modification time and size, so this only frees
+    memory; edited files are scanned again regardless.
+    """
+    _imports_for.cache_clear()
+
 
-    # Try each base path in order
-    for base_path in base_paths:
-        path_candidate_basename = os.path.normpath(os.path.join(base_path, path_import))
-        possible_pathes = [path_candidate_basename] + [f'{path_candidate_basename}.{ext}' for ext in EXTENSIONS]
+def _split_python_import(raw_import: str) -> List[str]:
+    """
+    Split the tail of a Python-style 'import' line into module names.
 
-        for possible_path in possible_pathes:
-            if os.path.isfile(possible_path):
-                return os.path.abspath(possible_path)
+    Lines that are really JS/TS or Java static imports are skipped.
 
-    return None
+    Args:
+        raw_import: Text following 'import' up to a comment or statement end
 
+    Returns:
+        Module names listed in the import
+    """
+    if (' from ' in raw_import or
+            raw_import.strip().startswith('static ') or
+            ('{' in raw_import or '}' in raw_import)):
+        return []
 
-def traverse_code(code: str) -> set[Any]:
-    # --- Python-style import lines ---
-    raw_imports = re.findall(PYTHON_IMPORT_PATTERN, code, re.MULTILINE)
     python_modules = []
-    for raw_import in raw_imports:
-        if (' from ' in raw_import or
-                raw_import.strip().startswith('static ') or
-                ('{' in raw_import or '}' in raw_import)):
+    import_parts = [i.strip().split('}')[0].strip() for i in raw_import.split(',')]
+    for part in import_parts:
+        if (not part or
+                (part.startswith('"') or part.startswith("'")) or
+                (part == '}') or ('*' in part)):
             continue
-        import_parts = [i.strip().split('}')[0].strip() for i in raw_import.split(',')]
-        for part in import_parts:
-            if (not part or
-                    (part.startswith('"') or part.startswith("'")) or
-                    (part == '}') or ('*' in part)):
-                continue
-            python_modules.append(part)
+        python_modules.append(part)
+
+    return python_modules
+
+
+def _keyword_starts(code: Union[str, bytes, mmap.mmap], keyword: str) -> List[int]:
+    """
+    Locate the candidate match starts of one keyword with substring searches.
+
+    Args:
+        code: Source code to scan, as str or raw bytes / memory map
+        keyword: Import keyword to search for
+
+    Returns:
+        Sorted candidate start offsets: the starts of the lines holding the
+        keyword for line keywords, the keyword positions otherwise
+    """
+    if isinstance(code, str):
+        needle, newline = keyword, '\n'
+    else:
+        needle, newline = keyword.encode('ascii'), b'\n'
+
+    starts = []
+    line_start = prev_pos = 0
+    pos = code.find(needle)
+    while pos != -1:
+        if keyword in _LINE_KEYWORDS:
+            # Only search back to the previous occurrence, so many
+            # occurrences on one long line stay linear
+            line_start = (code.rfind(newline, prev_pos, pos) + 1) or line_start
+            if not starts or starts[-1] != line_start:
+                starts.append(line_start)
+            prev_pos = pos
+        else:
+            starts.append(pos)
+        pos = code.find(needle, pos + len(needle))
+
+    return starts
+
+
+def _candidate_starts(code: Union[str, bytes, mmap.mmap]) -> List[int]:
+    """
+    Locate where the import regex can start matching.
+
+    With Hyperscan installed the prefilter finds them; Hyperscan reports byte
+    offsets, so non-ASCII str sources, like all sources without Hyperscan,
+    search for the keywords instead.
+
+    Args:
+        code: Source code to scan, as str or raw bytes / memory map
+
+    Returns:
+        Sorted candidate start offsets
+    """
+    if isinstance(code, str):
+        data = code.encode('ascii') if (_PREFILTER_DB is not None and code.isascii()) else None
+    else:
+        data = code if _PREFILTER_DB is not None else None
+
+    if data is None:
+        starts = set()
+        for keyword in _KEYWORDS:
+            starts.update(_keyword_starts(code, keyword))
+        return sorted(starts)
+
+    scratch = getattr(_prefilter_local, 'scratch', None)
+    if scratch is None:
+        scratch = _prefilter_local.scratch = hyperscan.Scratch(_PREFILTER_DB)
+
+    starts = set()
+    _PREFILTER_DB.scan(
+        data,
+        match_event_handler=lambda _id, start, _end, _flags, _context: starts.add(start),
+        scratch=scratch
+    )
+    return sorted(starts)
+
+
+def _iter_imports(code: Union[str, bytes, mmap.mmap]) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    """
+    Yield the imports of every style, as re.findall() of each style would.
+
+    The fused regex is tried once at each candidate start. Each style keeps
+    its own position, so its matches don't overlap each other while matches
+    of different styles may. Starts inside a style's previous match (which
+    only multi-line matches reach) try the other styles one by one instead,
+    so the covered style isn't matched over and over again.
+
+    Args:
+        code: Source code to scan, as str or raw bytes / memory map
+
+    Returns:
+        Iterator over (kind, captured name) pairs, in order of position
+    """
+    if isinstance(code, str):
+        import_re, style_res = _IMPORT_RE, _STYLE_RES
+    else:
+        import_re, style_res = _IMPORT_RE_BYTES, _STYLE_RES_BYTES
+    # End of each style's previous match
+    ends = [0] * len(_IMPORT_GROUPS)
+
+    for start in _candidate_starts(code):
+        if start < max(ends):
+            # Inside a previous match of some style; skip that style only
+            for i, (kind, _) in enumerate(_IMPORT_GROUPS):
+                match = style_res[i].match(code, start) if start >= ends[i] else None
+                if match:
+                    ends[i] = match.end()
+                    yield kind, match.group(1)
+            continue
+
+        spans = import_re.match(code, start).regs
+        for i, (kind, group) in enumerate(_IMPORT_GROUPS):
+            style_end = spans[group][1]
+            # Unmatched styles end at -1
+            if style_end != -1:
+                ends[i] = style_end
+                name_start, name_end = spans[group + 1]
+                yield kind, code[name_start:name_end]
 
-    python_imports = re.findall(PYTHON_FROM_IMPORT_PATTERN, code, re.MULTILINE)
-    java_imports = re.findall(JAVA_IMPORT_PATTERN, code, re.MULTILINE)
-    java_static_imports = re.findall(JAVA_STATIC_IMPORT_PATTERN, code, re.MULTILINE)
-    java_modules = java_imports + java_static_imports
 
-    typescript_imports = re.findall(typescript_imports_PATTERN, code, re.MULTILINE)
-    javascript_imports = re.findall(javascript_imports_PATTERN, code, re.MULTILINE)
-    all_names = python_modules + python_imports + java_modules + typescript_imports + javascript_imports
+def traverse_code(code: Union[str, bytes, mmap.mmap]) -> set[Any]:
+    """
+    Extract the imported module names and paths from source code.
+
+    Args:
+        code: Source code, as str or raw (UTF-8) bytes / memory map
+
+    Returns:
+        Set of import names as written in the source
+    """
+    all_names = []
+
+    for kind, name in _iter_imports(code):
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', 'replace')
+
+        if kind == 'python':
+            all_names.extend(_split_python_import(name))
+        else:
+            all_names.append(name)
+
     all_imports = set()
 
     for cur_name in all_names:
@@ -79,11 +428,259 @@ def traverse_code(code: str) -> set[Any]:
     return all_imports
 
 
+@functools.lru_cache(maxsize=8192)
+def _imports_for(file_path: str, mtime_ns: int, size: int) -> frozenset:
+    """
+    Read a source file and extract its imports, cached.
+
+    The modification time and size are part of the cache key so an edited
+    file is scanned again rather than served stale imports.
+
+    Args:
+        file_path: Path to the source file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
+
+    Returns:
+        Frozen set of import names as written in the source
+    """
+    with open(file_path, 'rb') as f:
+        # Large files are scanned straight from the page cache rather than
+        # copied into a bytes object first
+        if size > MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as code:
+                return frozenset(traverse_code(code))
+        code = f.read()
+
+    return frozenset(traverse_code(code))
+
+
+def _hash_and_scan(code: Union[bytes, mmap.mmap], cached: Optional[CachedImports]) -> Tuple[bytes, frozenset]:
+    """
+    Hash file content and scan it, unless the hash matches the cached entry.
+
+    Args:
+        code: Raw file content
+        cached: Stored entry for the file, if any
+
+    Returns:
+        Tuple of (SHA-1 digest of code, import names)
+    """
+    sha1 = hashlib.sha1(code).digest()
+    if cached is not None and cached.sha1 == sha1:
+        return sha1, cached.imports
+    return sha1, frozenset(traverse_code(code))
+
+
+def _persisted_imports_for(file_path: str, stat: os.stat_result, import_cache: ImportCache) -> frozenset:
+    """
+    Extract the imports of a source file through the on-disk import cache.
+
+    An entry with matching modification time and size is reused without
+    reading the file. Otherwise the content is hashed, and only rescanned if
+    the hash differs from the stored one.
+
+    Args:
+        file_path: Absolute path to the source file
+        stat: Result of os.stat() on the file
+        import_cache: Open on-disk cache
+
+    Returns:
+        Frozen set of import names as written in the source
+    """
+    cached = import_cache.get(file_path)
+    if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+        return cached.imports
+
+    with open(file_path, 'rb') as f:
+        if stat.st_size > MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as code:
+                sha1, imports = _hash_and_scan(code, cached)
+        else:
+            sha1, imports = _hash_and_scan(f.read(), cached)
+
+    import_cache.put(file_path, stat.st_mtime_ns, stat.st_size, sha1, imports)
+    return imports
+
+
+def _scan_file(
+    file_path: str,
+    import_cache: Optional[ImportCache] = None
+) -> Tuple[Optional[frozenset], Optional[Exception]]:
+    """
+    Extract the imports of a source file.
+
+    Runs on worker threads, so errors are returned instead of raised.
+    Files shared by several parents are only read once; see _imports_for().
+
+    Args:
+        file_path: Path to the source file
+        import_cache: Optional on-disk cache consulted before scanning
+
+    Returns:
+        Tuple of (imports, None) on success or (None, error) if the file can't be read
+    """
+    # Data files can be imported but have no imports of their own
+    if file_path.endswith(UNSCANNED_EXTENSIONS):
+        return frozenset(), None
+
+    try:
+        stat = os.stat(file_path)
+        if import_cache is not None:
+            return _persisted_imports_for(file_path, stat, import_cache), None
+        return _imports_for(file_path, stat.st_mtime_ns, stat.st_size), None
+    except Exception as e:
+        return None, e
+
+
+def _get_process_pool() -> 'ProcessPoolExecutor':
+    """
+    Get the worker process pool for scanning large BFS levels.
+
+    Created on first use and kept until shutdown_process_pool(). Workers are
+    started by a forkserver (or spawned where that is unavailable), never
+    forked from this process: the level scan runs while the thread pool of
+    traverse_dependencies() is alive, and forking a multi-threaded process
+    can deadlock the child. As with any non-fork start method, scripts that
+    traverse at import time need an `if __name__ == '__main__':` guard.
+
+    Returns:
+        Shared ProcessPoolExecutor
+    """
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _process_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _process_pool
+
+
+def _discard_process_pool(pool: 'ProcessPoolExecutor') -> None:
+    """
+    Drop a broken worker process pool, so the next large level starts a new one.
+
+    Args:
+        pool: Pool that raised BrokenProcessPool
+    """
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+
+    # The pool only terminates the workers it knew of when it broke; one
+    # started for a later task can be left blocked on the task queue, and
+    # interpreter exit would wait for it forever
+    workers = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for worker in workers:
+        worker.terminate()
+
+
+def shutdown_process_pool() -> None:
+    """
+    Shut down the worker process pool, if one was started.
+
+    Registered to run at interpreter exit; a later large level starts a new pool.
+    """
+    global _process_pool
+
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_process_pool)
+
+
+def _in_worker_process() -> bool:
+    """
+    Check whether this process is a multiprocessing worker.
+
+    Workers always have multiprocessing loaded, so the main process answers
+    without importing it.
+
+    Returns:
+        True if this process was started by multiprocessing
+    """
+    multiprocessing = sys.modules.get('multiprocessing')
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+def _level_size(level_files: List[str]) -> int:
+    """
+    Sum the sizes of the files of a BFS level.
+
+    Args:
+        level_files: Paths of the level's files
+
+    Returns:
+        Total size in bytes, counting unreadable files as empty
+    """
+    total = 0
+    for level_file in level_files:
+        try:
+            total += os.stat(level_file).st_size
+        except OSError:
+            pass
+    return total
+
+
+def _scan_level(
+    level_files: List[str],
+    thread_pool: Executor,
+    import_cache: Optional[ImportCache]
+) -> Iterator[Tuple[Optional[frozenset], Optional[Exception]]]:
+    """
+    Scan the files of one BFS level in parallel.
+
+    Levels with lots of source are spread over worker processes so the regex
+    work runs on all cores. Smaller levels, single-core machines, runs that
+    use the on-disk import cache, and runs already inside a worker process
+    use the thread pool, as does a level whose worker process died.
+
+    Args:
+        level_files: Paths of the level's files
+        thread_pool: Thread pool for reading and scanning
+        import_cache: Optional on-disk cache consulted before scanning
+
+    Returns:
+        Iterator over the _scan_file() results, in level_files order
+    """
+    if (import_cache is None and
+            len(level_files) > 1 and
+            (os.cpu_count() or 1) > 1 and
+            not _in_worker_process() and
+            _level_size(level_files) > PROCESS_SCAN_MIN_BYTES):
+        from concurrent.futures.process import BrokenProcessPool
+
+        pool = _get_process_pool()
+        chunksize = max(1, len(level_files) // ((os.cpu_count() or 1) * 4))
+        try:
+            # Collected here, so a worker dying mid-level is handled below
+            return iter(list(pool.map(_scan_file, level_files, chunksize=chunksize)))
+        except BrokenProcessPool:
+            # A worker was killed (e.g. out of memory); the pool can't be used anymore
+            _discard_process_pool(pool)
+
+    return thread_pool.map(functools.partial(_scan_file, import_cache=import_cache), level_files)
+
+
 def traverse_dependencies(
     file_path: str,
     base_import_roots: Optional[List[str]],
     depth_max: Optional[int] = None,
-    is_verbose: bool = False
+    is_verbose: bool = False,
+    import_cache: Union[str, ImportCache, None] = None,
+    resolver: Optional[ImportResolver] = None
 ) -> List[str]:
     """
     Traverse and discover dependencies of a file recursively.
@@ -95,57 +692,81 @@ def traverse_dependencies(
                           For backward compatibility, can also accept a single string.
         depth_max: Maximum recursion depth (None for unlimited)
         is_verbose: Whether to print debug information
+        import_cache: On-disk import cache to reuse scan results from across
+                      runs: an open ImportCache shared by the traversals of
+                      one run, the path of a database to open for this call,
+                      or None to disable
+        resolver: Resolver shared by the traversals of one run, so they reuse
+                  each other's resolutions (None for a new one)
 
     Returns:
-        List of absolute paths to all discovered dependencies
+        List of absolute paths to all discovered dependencies, breadth-first:
+        every file comes before those only reachable through a deeper level
     """
     # Backward compatibility: convert string to list
     if isinstance(base_import_roots, str):
         base_import_roots = [base_import_roots]
 
-    discovered_dependencies = set()
+    # Hashable once here, rather than converted for every resolved import
+    if base_import_roots is not None:
+        base_import_roots = tuple(base_import_roots)
+
+    if resolver is None:
+        resolver = ImportResolver()
+
+    # Dict as an insertion-ordered set, keeping the result in discovery order
+    discovered_dependencies = {}
     already_processed = set()
 
     absolute_source_path = os.path.abspath(file_path)
     already_processed.add(absolute_source_path)
 
-    bfs_q = [(absolute_source_path, 0)]
+    bfs_q = deque([(absolute_source_path, 0)])
 
-    while bfs_q:
-        cur_file, cur_depth = bfs_q.pop(0)
+    if isinstance(import_cache, str):
+        # Closed after the scan threads are done, writing its new entries at once
+        cache_context = ImportCache(import_cache)
+    else:
+        # Owned by the caller
+        cache_context = contextlib.nullcontext(import_cache)
 
-        if depth_max is not None and cur_depth > depth_max:
-            continue
+    with cache_context as cache, ThreadPoolExecutor(max_workers=MAX_SCAN_WORKERS) as executor:
+        while bfs_q:
+            # Drain the whole current depth level; all queued entries share it
+            level = [bfs_q.popleft() for _ in range(len(bfs_q))]
+            cur_depth = level[0][1]
 
-        if is_verbose:
-            print(f"Processing {cur_file} (depth {cur_depth})")
+            if depth_max is not None and cur_depth > depth_max:
+                continue
 
-        try:
-            with open(cur_file, 'r', encoding='utf-8') as f:
-                code = f.read()
-        except Exception as e:
-            if is_verbose:
-                print(f"Error reading {cur_file}: {e}")
-            continue
+            level_files = [cur_file for cur_file, _ in level]
 
-        file_imports = traverse_code(code)
+            # Read and scan the level's files in parallel, resolve serially
+            for cur_file, (file_imports, error) in zip(level_files, _scan_level(level_files, executor, cache)):
+                if is_verbose:
+                    print(f"Processing {cur_file} (depth {cur_depth})")
 
-        file_dir = os.path.dirname(cur_file)
-        base_paths = [file_dir] if (base_import_roots is None) else base_import_roots
+                if error is not None:
+                    if is_verbose:
+                        print(f"Error reading {cur_file}: {error}")
+                    continue
 
-        for import_path in file_imports:
-            resolved = relative_to_absolute(base_paths, import_path)
+                file_dir = os.path.dirname(cur_file)
+                base_paths = (file_dir,) if (base_import_roots is None) else base_import_roots
 
-            if resolved is not None:
-                absolute_resolved_path = os.path.abspath(resolved)
+                # Sorted so the discovery order doesn't depend on string hashing
+                for import_path in sorted(file_imports):
+                    resolved = resolver.resolve(base_paths, import_path)
 
-                if absolute_resolved_path == absolute_source_path:
-                    continue
+                    # Resolved paths are already absolute and normalized
+                    if resolved is not None:
+                        if resolved == absolute_source_path:
+                            continue
 
-                discovered_dependencies.add(absolute_resolved_path)
+                        discovered_dependencies[resolved] = None
 
-                if absolute_resolved_path not in already_processed:
-                    already_processed.add(absolute_resolved_path)
-                    bfs_q.append((absolute_resolved_path, cur_depth + 1))
+                        if resolved not in already_processed:
+                            already_processed.add(resolved)
+                            bfs_q.append((resolved, cur_depth + 1))
 
-    return list(discovered_dependencies)
\ No newline at end of file
+    return list(discovered_dependencies)
@@ -5,22 +5,35 @@ Tests the complete workflow from command-line arguments to output generation.
 
 import pytest
 import os
+import subprocess
 import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 from io import StringIO
-from argparse import Namespace
 
 from codecontextcrafter.code_context_crafter import (
     _create_argument_parser,
     _collect_files_to_process,
     _resolve_file_dependencies,
-    _format_output_prompt,
     _read_source_file,
-    _write_output,
-    ccc
+    _find_by_name_in_process,
+    _stream_output,
+    _write_prompt,
+    _count_tokens,
+    _TOKEN_COUNTS,
+    ccc,
+    PARALLEL_READ_MIN_FILES,
+    TOKEN_COUNT_CACHE_SIZE
 )
+from codecontextcrafter.traverser.import_cache import ImportCache
+
+
+def _render_prompt(primary_files, signatures, sig_only):
+    """Return the prompt _write_prompt writes, as a string."""
+    prompt = StringIO()
+    _write_prompt(prompt, primary_files, signatures, sig_only)
+    return prompt.getvalue()
 
 
 class TestArgumentParser:
@@ -34,74 +47,42 @@ class TestArgumentParser:
         with pytest.raises(SystemExit):
             parser.parse_args(['--help'])
 
-    def test_parse_single_file(self):
-        """Test parsing a single file argument."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py'])
-
-        assert args.files == ['test.py']
-        assert args.root is None
-        assert args.dep_depth_max is None
-
-    def test_parse_multiple_files(self):
-        """Test parsing multiple file arguments."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['file1.py', 'file2.py', 'file3.py'])
-
-        assert args.files == ['file1.py', 'file2.py', 'file3.py']
-
-    def test_parse_with_root(self):
-        """Test parsing with --root argument."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--root', '/my/root'])
-
-        assert args.root == '/my/root'
-
-    def test_parse_with_depth(self):
-        """Test parsing with --dep-depth-max argument."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--dep-depth-max', '5'])
-
-        assert args.dep_depth_max == 5
-
-    def test_parse_with_output(self):
-        """Test parsing with --output argument."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--output', 'out.md'])
-
-        assert args.output == 'out.md'
-
-    def test_parse_with_sig_tokens(self):
-        """Test parsing with --sig-tokens argument."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--sig-tokens', '4000'])
-
-        assert args.sig_tokens == 4000
-
-    def test_parse_with_verbose(self):
-        """Test parsing with --verbose flag."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--verbose'])
-
-        assert args.verbose is True
-
-    def test_parse_with_sig_only(self):
-        """Test parsing with --sig-only flag."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--sig-only'])
-
-        assert args.sig_only is True
-
-    def test_parse_with_config(self):
-        """Test parsing with --config argument."""
-        parser = _create_argument_parser()
-        args = parser.parse_args(['test.py', '--config', '.ccc.conf'])
-
-        assert args.config == '.ccc.conf'
-
-    def test_parse_all_arguments(self):
+    def test_import_defers_signature_dependencies(self):
+        """Test that importing the CLI module does not load tokenizer or RepoMap dependencies."""
+        code = (
+            "import sys, codecontextcrafter.code_context_crafter; "
+            "print(sorted(m for m in ('tiktoken', 'codecontextcrafter.aider.repomap', "
+            "'codecontextcrafter.aider.io') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "[]"
+
+    @pytest.mark.parametrize("argv,attr,expected", [
+        (['test.py'], 'files', ['test.py']),
+        (['test.py'], 'root', None),
+        (['test.py'], 'dep_depth_max', None),
+        (['file1.py', 'file2.py', 'file3.py'], 'files', ['file1.py', 'file2.py', 'file3.py']),
+        (['test.py', '--root', '/my/root'], 'root', '/my/root'),
+        (['test.py', '--dep-depth-max', '5'], 'dep_depth_max', 5),
+        (['test.py', '--output', 'out.md'], 'output', 'out.md'),
+        (['test.py', '--sig-tokens', '4000'], 'sig_tokens', 4000),
+        (['test.py', '--verbose'], 'verbose', True),
+        (['test.py', '--sig-only'], 'sig_only', True),
+        (['test.py', '--config', '.ccc.conf'], 'config', '.ccc.conf'),
+    ])
+    def test_parse_single_attr(self, parser, argv, attr, expected):
+        """Test that each argument is parsed into its namespace attribute."""
+        args = parser.parse_args(argv)
+
+        assert getattr(args, attr) == expected
+
+    def test_arg_defaults_match_parser(self, parser, make_args):
+        """Test that the make_args fixture mirrors the parser's defaults."""
+        assert vars(make_args()) == vars(parser.parse_args([]))
+
+    def test_parse_all_arguments(self, parser):
         """Test parsing with all arguments together."""
-        parser = _create_argument_parser()
         args = parser.parse_args([
             'test.py',
             '--root', '/root',
@@ -126,42 +107,68 @@ class TestArgumentParser:
 class TestCollectFilesToProcess:
     """Test file collection functionality."""
 
-    def test_collect_from_files_argument(self, tmp_path):
+    def test_collect_from_files_argument(self, parser, sample_tree):
         """Test collecting files from direct file arguments."""
-        file1 = tmp_path / "file1.py"
-        file2 = tmp_path / "file2.py"
-        file1.write_text("# file1")
-        file2.write_text("# file2")
+        file1 = sample_tree / "file1.py"
+        file2 = sample_tree / "file2.py"
 
-        parser = _create_argument_parser()
         args = parser.parse_args([str(file1), str(file2)])
 
         files = _collect_files_to_process(args, parser)
 
         assert len(files) == 2
-        assert str(file1.resolve()) in files
-        assert str(file2.resolve()) in files
+        assert {str(file1.resolve()), str(file2.resolve())} <= set(files)
 
-    def test_collect_from_find_command(self, tmp_path):
+    def test_collect_from_find_command(self, parser, sample_tree):
         """Test collecting files from --find-by command."""
-        # Create test files
-        (tmp_path / "test1.py").write_text("# test1")
-        (tmp_path / "test2.py").write_text("# test2")
-
-        parser = _create_argument_parser()
-        find_cmd = f"find {tmp_path} -name '*.py'"
+        find_cmd = f"find {sample_tree} -name 'file*.py'"
         args = parser.parse_args(['--find-by', find_cmd])
 
         files = _collect_files_to_process(args, parser)
 
         assert len(files) == 2
 
-    def test_collect_deduplicates_files(self, tmp_path):
+    def test_find_by_fastpath_no_subprocess(self, parser, tmp_path):
+        """Test that a plain find by extension is run without a subprocess."""
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "main.py").write_text("# main")
+        (tmp_path / "pkg" / "mod.py").write_text("# mod")
+        (tmp_path / "notes.txt").write_text("notes")
+        args = parser.parse_args(['--find-by', f"find {tmp_path} -name '*.py'"])
+
+        with patch('subprocess.run', side_effect=AssertionError("subprocess used")):
+            files = _collect_files_to_process(args, parser)
+
+        assert sorted(files) == sorted([str(tmp_path / "main.py"), str(tmp_path / "pkg" / "mod.py")])
+
+    def test_find_by_fastpath_matches_find(self, parser, tmp_path):
+        """Test that the in-process walk returns what find itself prints."""
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / ".hidden").mkdir()
+        for name in ["x.py", "a/y.py", "a/b/z.py", ".hidden/w.py", "a/readme.md"]:
+            (tmp_path / name).write_text("")
+        find_cmd = f"find {tmp_path} -name \"*.py\""
+
+        result = subprocess.run(find_cmd, shell=True, check=True, capture_output=True, text=True)
+
+        expected = [os.path.normpath(path) for path in result.stdout.split()]
+        assert [os.path.normpath(path) for path in _find_by_name_in_process(find_cmd)] == expected
+
+    def test_find_by_fastpath_skips_symlinked_root(self, parser, tmp_path):
+        """Test that a symlinked root is left to find, which does not follow it."""
+        (tmp_path / "real").mkdir()
+        (tmp_path / "real" / "x.py").write_text("")
+        (tmp_path / "link").symlink_to(tmp_path / "real")
+
+        assert _find_by_name_in_process(f"find {tmp_path / 'link'} -name '*.py'") is None
+        assert _find_by_name_in_process(f"find {tmp_path / 'link'}/ -name '*.py'") == [
+            os.path.join(f"{tmp_path / 'link'}/", "x.py")
+        ]
+
+    def test_collect_deduplicates_files(self, parser, sample_tree):
         """Test that duplicate files are removed."""
-        file1 = tmp_path / "file1.py"
-        file1.write_text("# file1")
+        file1 = sample_tree / "file1.py"
 
-        parser = _create_argument_parser()
         # Specify same file twice
         args = parser.parse_args([str(file1), str(file1)])
 
@@ -170,9 +177,58 @@ class TestCollectFilesToProcess:
         # Should only have one entry
         assert len(files) == 1
 
-    def test_collect_exits_on_no_files(self, tmp_path):
+    def test_collect_resolves_relative_paths_in_order(self, parser, tmp_path, monkeypatch):
+        """Test that relative paths are made absolute and first-seen order is kept."""
+        (tmp_path / "src").mkdir()
+        monkeypatch.chdir(tmp_path)
+
+        args = parser.parse_args(["src/b.py", "./a.py", "src/b.py", "src/../c.py"])
+
+        files = _collect_files_to_process(args, parser)
+
+        assert files == [
+            os.path.abspath("src/b.py"),
+            os.path.abspath("a.py"),
+            os.path.abspath("c.py"),
+        ]
+
+    def test_collect_deduplicates_equivalent_paths(self, parser, sample_tree, monkeypatch):
+        """Test that different spellings of the same path are collected once."""
+        monkeypatch.chdir(sample_tree)
+
+        args = parser.parse_args(["file1.py", "./file1.py", str(sample_tree / "file1.py"), "file2.py"])
+
+        files = _collect_files_to_process(args, parser)
+
+        assert files == [os.path.abspath("file1.py"), os.path.abspath("file2.py")]
+
+    def test_collect_dedup_scaling(self, parser, tmp_path, monkeypatch):
+        """Test deduplication of a large --find-by style file list."""
+        monkeypatch.chdir(tmp_path)
+        names = [f"pkg/module{i}.py" for i in range(5000)]
+
+        args = parser.parse_args(names + [f"./{name}" for name in names] + names)
+
+        files = _collect_files_to_process(args, parser)
+
+        assert files == [os.path.abspath(name) for name in names]
+
+    def test_collect_does_not_touch_filesystem(self, parser, tmp_path, monkeypatch):
+        """Test that collected paths are made absolute without stat or readlink calls."""
+        monkeypatch.chdir(tmp_path)
+        names = [f"a/b/c/d/module{i}.py" for i in range(500)]
+        args = parser.parse_args(names + names)
+
+        with patch("os.stat") as stat, patch("os.lstat") as lstat, patch("os.readlink") as readlink:
+            files = _collect_files_to_process(args, parser)
+
+        assert len(files) == 500
+        assert stat.call_count == 0
+        assert lstat.call_count == 0
+        assert readlink.call_count == 0
+
+    def test_collect_exits_on_no_files(self, parser, tmp_path):
         """Test that program exits when no files are specified."""
-        parser = _create_argument_parser()
         args = parser.parse_args([])
 
         with pytest.raises(SystemExit):
@@ -182,44 +238,30 @@ class TestCollectFilesToProcess:
 class TestResolveFileDependencies:
     """Test dependency resolution functionality."""
 
-    def test_resolve_with_sig_only(self, tmp_path):
+    def test_resolve_with_sig_only(self, make_args, sample_tree):
         """Test that sig_only mode treats all files as signatures."""
-        file1 = tmp_path / "file1.py"
-        file1.write_text("import os")
-
-        args = Namespace(
-            sig_only=True,
-            root=None,
-            dep_depth_max=None,
-            verbose=False
-        )
+        file1 = sample_tree / "file1.py"
+
+        args = make_args(sig_only=True)
 
         primary_files, signature_files = _resolve_file_dependencies([str(file1)], args)
 
         assert len(primary_files) == 0
         assert str(file1) in signature_files
 
-    def test_resolve_without_sig_only(self, tmp_path):
+    def test_resolve_without_sig_only(self, make_args, sample_tree):
         """Test normal mode with primary files and dependencies."""
-        main_file = tmp_path / "main.py"
-        dep_file = tmp_path / "dep.py"
+        main_file = sample_tree / "main.py"
+        dep_file = sample_tree / "dep.py"
 
-        main_file.write_text("from dep import func")
-        dep_file.write_text("def func(): pass")
-
-        args = Namespace(
-            sig_only=False,
-            root=[str(tmp_path)],
-            dep_depth_max=1,
-            verbose=False
-        )
+        args = make_args(root=[str(sample_tree)], dep_depth_max=1)
 
         primary_files, signature_files = _resolve_file_dependencies([str(main_file)], args)
 
         assert str(main_file) in primary_files
         assert str(dep_file.resolve()) in signature_files
 
-    def test_resolve_with_multiple_roots(self, tmp_path):
+    def test_resolve_with_multiple_roots(self, make_args, tmp_path):
         """Test dependency resolution with multiple root paths."""
         module1 = tmp_path / "module1"
         module2 = tmp_path / "module2"
@@ -232,85 +274,129 @@ class TestResolveFileDependencies:
         main_file.write_text("from dep import func")
         dep_file.write_text("def func(): pass")
 
-        args = Namespace(
-            sig_only=False,
-            root=[str(module1), str(module2)],
-            dep_depth_max=1,
-            verbose=False
-        )
+        args = make_args(root=[str(module1), str(module2)], dep_depth_max=1)
 
         primary_files, signature_files = _resolve_file_dependencies([str(main_file)], args)
 
         assert str(main_file) in primary_files
         assert str(dep_file.resolve()) in signature_files
 
+    def test_resolve_many_primary_files(self, make_args, tmp_path):
+        """Test that the dependencies of every primary file are collected."""
+        main_files = []
+        dep_files = []
+        for i in range(8):
+            main_file = tmp_path / f"main{i}.py"
+            dep_file = tmp_path / f"dep{i}.py"
+            main_file.write_text(f"from dep{i} import func")
+            dep_file.write_text("def func(): pass")
+            main_files.append(str(main_file))
+            dep_files.append(str(dep_file.resolve()))
+
+        args = make_args(root=[str(tmp_path)], dep_depth_max=1)
+
+        primary_files, signature_files = _resolve_file_dependencies(main_files, args)
+
+        assert primary_files == main_files
+        assert signature_files == dep_files
+
+    def test_resolve_with_import_cache(self, make_args, tmp_path, monkeypatch):
+        """Test that the import cache is opened once per run, below $XDG_CACHE_HOME."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        main_files = []
+        for i in range(3):
+            main_file = tmp_path / f"main{i}.py"
+            main_file.write_text("from dep import func")
+            main_files.append(str(main_file))
+        (tmp_path / "dep.py").write_text("def func(): pass")
+
+        opened = []
+        real_init = ImportCache.__init__
+
+        def counting_init(cache, *args, **kwargs):
+            opened.append(cache)
+            real_init(cache, *args, **kwargs)
+
+        monkeypatch.setattr(ImportCache, "__init__", counting_init)
+        args = make_args(root=[str(tmp_path)], import_cache=True)
 
-class TestFormatOutputPrompt:
+        _, signature_files = _resolve_file_dependencies(main_files, args)
+
+        assert signature_files == [str((tmp_path / "dep.py").resolve())]
+        assert len(opened) == 1
+        assert (tmp_path / "cache" / "ccc" / "imports.sqlite3").exists()
+
+
+class TestWritePrompt:
     """Test output formatting functionality."""
 
-    def test_format_with_primary_and_signatures(self, tmp_path):
+    def test_format_with_primary_and_signatures(self, sample_tree):
         """Test formatting with both primary files and signatures."""
-        file1 = tmp_path / "main.py"
-        file1.write_text("def main(): pass")
+        file1 = sample_tree / "main.py"
 
         signatures = "Signature for dependency"
 
-        result = _format_output_prompt([str(file1)], signatures, sig_only=False)
+        result = _render_prompt([str(file1)], signatures, sig_only=False)
 
         assert "# Context" in result
         assert "## Primary Files (Full Content)" in result
         assert "## Dependencies (Signatures)" in result
-        assert "def main(): pass" in result
+        assert "from dep import func" in result
         assert "Signature for dependency" in result
 
     def test_format_sig_only_mode(self, tmp_path):
         """Test formatting in signatures-only mode."""
         signatures = "Signature content"
 
-        result = _format_output_prompt([], signatures, sig_only=True)
+        result = _render_prompt([], signatures, sig_only=True)
 
         assert "# Context" in result
         assert "## File Signatures" in result
         assert "Primary Files" not in result
         assert "Signature content" in result
 
-    def test_format_with_no_signatures(self, tmp_path):
+    def test_format_with_no_signatures(self, sample_tree):
         """Test formatting when there are no signatures."""
-        file1 = tmp_path / "main.py"
-        file1.write_text("def main(): pass")
+        file1 = sample_tree / "main.py"
 
-        result = _format_output_prompt([str(file1)], "", sig_only=False)
+        result = _render_prompt([str(file1)], "", sig_only=False)
 
         assert "# Context" in result
         assert "## Primary Files (Full Content)" in result
         assert "## Dependencies (Signatures)" not in result
 
-    def test_format_with_multiple_primary_files(self, tmp_path):
+    def test_format_with_multiple_primary_files(self, sample_tree):
         """Test formatting with multiple primary files."""
-        file1 = tmp_path / "file1.py"
-        file2 = tmp_path / "file2.py"
-        file1.write_text("# file1 content")
-        file2.write_text("# file2 content")
+        file1 = sample_tree / "file1.py"
+        file2 = sample_tree / "file2.py"
 
-        result = _format_output_prompt([str(file1), str(file2)], "", sig_only=False)
+        result = _render_prompt([str(file1), str(file2)], "", sig_only=False)
 
         assert "# file1 content" in result
         assert "# file2 content" in result
         assert result.count("###") >= 2  # Should have headers for each file
 
+    def test_format_code_block_languages(self, tmp_path):
+        """Test that code blocks are tagged with the language of the file extension."""
+        files = {"a.py": "python", "b.JSX": "javascript", "c.ts": "typescript",
+                 "d.java": "java", "e.hpp": "cpp", "f.txt": ""}
+        for name in files:
+            (tmp_path / name).write_text("content")
+
+        result = _render_prompt([str(tmp_path / name) for name in files], "", sig_only=False)
+
+        for name, language in files.items():
+            assert f"### {tmp_path / name}\n```{language}\n" in result
+
 
 class TestReadSourceFile:
     """Test file reading functionality."""
 
-    def test_read_valid_file(self, tmp_path):
+    def test_read_valid_file(self, sample_tree):
         """Test reading a valid source file."""
-        test_file = tmp_path / "test.py"
-        content = "def test():\n    return True"
-        test_file.write_text(content)
+        result = _read_source_file(str(sample_tree / "dep.py"))
 
-        result = _read_source_file(str(test_file))
-
-        assert result == content
+        assert result == "def func(): pass"
 
     def test_read_nonexistent_file(self):
         """Test reading a file that doesn't exist."""
@@ -329,59 +415,133 @@ class TestReadSourceFile:
         assert result == content
 
 
-class TestWriteOutput:
-    """Test output writing functionality."""
+class TestCountTokens:
+    """Test memoized token counting."""
+
+    def test_repeated_text_encoded_once(self):
+        """Test that counting the same text again does not encode it again."""
+        encoding = MagicMock()
+        encoding.encode.side_effect = lambda text: text.split()
+        text = "def main(): pass " * 1000
+
+        with patch('codecontextcrafter.code_context_crafter._get_encoding', return_value=encoding):
+            counts = [_count_tokens(text), _count_tokens(text), _count_tokens("x")]
+
+        assert counts == [3000, 3000, 1]
+        assert encoding.encode.call_count == 2
+        # Only a digest and the length are kept, not the counted text
+        assert all(len(digest) == 16 for digest, length in _TOKEN_COUNTS)
+
+    def test_least_recently_used_count_evicted(self):
+        """Test that the memo stays bounded, dropping the least recently used count first."""
+        encoding = MagicMock()
+        encoding.encode.side_effect = lambda text: [text]
 
-    def test_write_to_file(self, tmp_path):
-        """Test writing output to a file."""
+        with patch('codecontextcrafter.code_context_crafter._get_encoding', return_value=encoding):
+            for i in range(TOKEN_COUNT_CACHE_SIZE):
+                _count_tokens(str(i))
+            _count_tokens("0")
+            _count_tokens("new")
+            encoding.encode.reset_mock()
+            _count_tokens("0")
+            _count_tokens("1")
+
+        assert len(_TOKEN_COUNTS) == TOKEN_COUNT_CACHE_SIZE
+        assert [call.args[0] for call in encoding.encode.call_args_list] == ["1"]
+
+
+class TestStreamOutput:
+    """Test streaming the prompt to its destination."""
+
+    def test_stream_to_file_matches_formatted_prompt(self, tmp_path):
+        """Test that the streamed file equals the formatted prompt."""
+        file1 = tmp_path / "main.py"
+        file2 = tmp_path / "util.js"
+        file1.write_text("def main(): pass\n# é, 中文")
+        file2.write_text("module.exports = {}")
         output_file = tmp_path / "output.md"
-        content = "# Test Output\nSome content"
+        primary_files = [str(file2), str(file1)]
 
-        _write_output(content, str(output_file))
+        _stream_output(primary_files, "Signature content", False, str(output_file))
 
-        assert output_file.exists()
-        assert output_file.read_text() == content
+        expected = _render_prompt(primary_files, "Signature content", sig_only=False)
+        assert output_file.read_text(encoding='utf-8') == expected
 
-    def test_write_to_stdout(self, capsys):
-        """Test writing output to stdout."""
-        content = "# Test Output\nSome content"
+    def test_stream_to_stream(self, tmp_path):
+        """Test that streaming without an output path writes the formatted prompt."""
+        file1 = tmp_path / "main.py"
+        file1.write_text("def main(): pass")
+        buffer = StringIO()
 
-        _write_output(content, None)
+        _stream_output([str(file1)], "", False, None, stream=buffer)
 
-        captured = capsys.readouterr()
-        assert content in captured.out
+        assert buffer.getvalue() == _render_prompt([str(file1)], "", sig_only=False) + "\n"
 
+    def test_many_primary_files_read_ahead_in_order(self, tmp_path):
+        """Test that primary files read on worker threads are written in sorted order."""
+        primary_files = []
+        for i in range(PARALLEL_READ_MIN_FILES * 3):
+            file_path = tmp_path / f"module{i:02d}.py"
+            file_path.write_text(f"VALUE = {i}")
+            primary_files.append(str(file_path))
+        primary_files.append(str(tmp_path / "missing.py"))
 
-class TestCLIIntegration:
-    """Integration tests for the complete CLI workflow."""
+        result = _render_prompt(list(reversed(primary_files)), "", sig_only=False)
 
-    def test_cli_with_config_file(self, tmp_path, monkeypatch):
-        """Test CLI with automatic config file discovery."""
-        # Create config file
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
-root = {tmp_path}
-dep_depth_max = 1
-verbose = false
-        """.format(tmp_path=tmp_path))
+        # 'missing.py' sorts before the 'module*.py' files
+        expected = "# Context\n\n## Primary Files (Full Content)\n\n"
+        expected += f"### {primary_files[-1]}\n```python\n"
+        assert result.startswith(expected + "Error reading")
+        expected_blocks = "".join(
+            f"### {path}\n```python\nVALUE = {i}\n```\n\n" for i, path in enumerate(primary_files[:-1])
+        )
+        assert result.endswith(expected_blocks)
+
+    def test_stream_unreadable_primary_file(self, tmp_path):
+        """Test that a missing primary file is reported inline."""
+        output_file = tmp_path / "output.md"
+
+        _stream_output([str(tmp_path / "missing.py")], "", False, str(output_file))
+
+        assert "Error reading" in output_file.read_text()
+
+    @pytest.mark.parametrize("count", [1, PARALLEL_READ_MIN_FILES])
+    def test_undecodable_primary_file_reported_without_content(self, tmp_path, count):
+        """Test that a file failing to decode is reported the same way with and without read-ahead."""
+        primary_files = []
+        for i in range(count):
+            file_path = tmp_path / f"module{i}.py"
+            file_path.write_bytes(b"VALUE = 1\n" * 1000 + b"\xff")
+            primary_files.append(str(file_path))
 
-        # Create test files
+        result = _render_prompt(primary_files, "", sig_only=False)
+
+        assert "VALUE" not in result
+        assert result.count("```python\nError reading") == count
+
+    def test_output_to_primary_file_rejected(self, tmp_path, capsys):
+        """Test that an output path naming a primary file is rejected before it is truncated."""
         main_file = tmp_path / "main.py"
-        main_file.write_text("import os")
+        main_file.write_text("def main(): pass")
+
+        with pytest.raises(SystemExit) as exc_info:
+            ccc([str(main_file), '--output', str(main_file)])
+
+        assert exc_info.value.code == 1
+        assert "is one of the primary files" in capsys.readouterr().err
+        assert main_file.read_text() == "def main(): pass"
 
-        # Change to directory with config file
-        monkeypatch.chdir(tmp_path)
 
-        # Mock sys.argv
-        test_args = ['ccc', str(main_file)]
-        with patch.object(sys, 'argv', test_args):
-            # The config file should be auto-discovered
-            # This is an integration test, so we just verify it doesn't crash
-            parser = _create_argument_parser()
-            args = parser.parse_args(test_args[1:])
-            assert args.config is None  # Not explicitly set, will be auto-discovered
+class TestCLIIntegration:
+    """Integration tests for the complete CLI workflow."""
+
+    def test_config_not_auto_discovered_by_argparse(self, parser):
+        """Test that argparse leaves config unset so it can be auto-discovered later."""
+        args = parser.parse_args(['test.py'])
 
-    def test_cli_explicit_config(self, tmp_path):
+        assert args.config is None
+
+    def test_cli_explicit_config(self, parser, tmp_path):
         """Test CLI with explicitly specified config file."""
         config_file = tmp_path / "my-config.conf"
         config_file.write_text("""
@@ -389,18 +549,16 @@ root = {tmp_path}
 dep_depth_max = 2
         """.format(tmp_path=tmp_path))
 
-        parser = _create_argument_parser()
         args = parser.parse_args(['test.py', '--config', str(config_file)])
 
         assert args.config == str(config_file)
 
-    def test_cli_override_config_with_cli(self, tmp_path):
+    def test_cli_override_config_with_cli(self, parser, tmp_path):
         """Test that CLI arguments override config file settings."""
         # This is tested in config_parser tests, but verify integration
         config_file = tmp_path / ".ccc.conf"
         config_file.write_text("dep_depth_max = 5")
 
-        parser = _create_argument_parser()
         args = parser.parse_args(['test.py', '--dep-depth-max', '1'])
 
         # CLI should win
@@ -410,25 +568,22 @@ dep_depth_max = 2
 class TestErrorHandling:
     """Test error handling in various scenarios."""
 
-    def test_invalid_find_command(self, tmp_path):
+    def test_invalid_find_command(self, parser, tmp_path):
         """Test handling of invalid --find-by command."""
-        parser = _create_argument_parser()
         args = parser.parse_args(['--find-by', 'invalid_command_xyz'])
 
         with pytest.raises(SystemExit):
             _collect_files_to_process(args, parser)
 
-    def test_nonexistent_config_file(self, tmp_path, capsys):
+    def test_nonexistent_config_file(self, parser):
         """Test handling of non-existent config file."""
-        parser = _create_argument_parser()
         args = parser.parse_args(['test.py', '--config', '/nonexistent/config.conf'])
 
         # Config file loading should fail gracefully
         # This is handled in the main ccc() function
 
-    def test_empty_file_list(self):
+    def test_empty_file_list(self, parser):
         """Test handling when no files match the criteria."""
-        parser = _create_argument_parser()
         args = parser.parse_args([])
 
         with pytest.raises(SystemExit):
@@ -438,57 +593,42 @@ class TestErrorHandling:
 class TestMultiModuleSupport:
     """Integration tests for multi-module project support."""
 
-    def test_cross_module_resolution(self, tmp_path):
+    def test_cross_module_resolution(self, make_args, tmp_path, build_tree):
         """Test dependency resolution across multiple modules."""
-        # Create multi-module structure
+        # Create multi-module structure: module1 imports from module2
+        build_tree(tmp_path, {
+            "module1/main.py": "from utils import helper",
+            "module2/utils.py": "def helper(): pass",
+        })
         module1 = tmp_path / "module1"
         module2 = tmp_path / "module2"
-        module1.mkdir()
-        module2.mkdir()
-
-        # Module1 imports from Module2
         main = module1 / "main.py"
-        main.write_text("from utils import helper")
-
         utils = module2 / "utils.py"
-        utils.write_text("def helper(): pass")
 
         # Create args with multiple roots
-        args = Namespace(
-            sig_only=False,
-            root=[str(module1), str(module2)],
-            dep_depth_max=1,
-            verbose=False
-        )
+        args = make_args(root=[str(module1), str(module2)], dep_depth_max=1)
 
         primary_files, signature_files = _resolve_file_dependencies([str(main)], args)
 
         # Should find dependency in module2
         assert str(utils.resolve()) in signature_files
 
-    def test_module_priority(self, tmp_path):
+    def test_module_priority(self, make_args, tmp_path, build_tree):
         """Test that first matching module is used when file exists in multiple modules."""
+        # Same filename in both modules
+        build_tree(tmp_path, {
+            "module1/config.py": "VERSION = 1",
+            "module2/config.py": "VERSION = 2",
+            "main.py": "from config import VERSION",
+        })
         module1 = tmp_path / "module1"
         module2 = tmp_path / "module2"
-        module1.mkdir()
-        module2.mkdir()
-
-        # Same filename in both modules
         config1 = module1 / "config.py"
         config2 = module2 / "config.py"
-        config1.write_text("VERSION = 1")
-        config2.write_text("VERSION = 2")
-
         main = tmp_path / "main.py"
-        main.write_text("from config import VERSION")
 
         # Module1 is listed first, should be found first
-        args = Namespace(
-            sig_only=False,
-            root=[str(module1), str(module2)],
-            dep_depth_max=1,
-            verbose=False
-        )
+        args = make_args(root=[str(module1), str(module2)], dep_depth_max=1)
 
         primary_files, signature_files = _resolve_file_dependencies([str(main)], args)
 
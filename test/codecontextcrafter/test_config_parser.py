@@ -3,11 +3,15 @@ Tests for config file parser and parameter precedence.
 """
 
 import pytest
+import io
 import os
 import tempfile
 from argparse import Namespace
+from unittest.mock import patch
 from codecontextcrafter.config_parser import (
+    CCCConfig,
     parse_config_file,
+    _parse_config_stream,
     apply_config_defaults,
     validate_config,
     _get_default_value
@@ -30,30 +34,59 @@ sig_only = false
 
         config = parse_config_file(str(config_file))
 
-        assert config['root'] == '/path/to/root'
-        assert config['dep_depth_max'] == 5
-        assert config['verbose'] is True
-        assert config['sig_only'] is False
+        assert config.root == '/path/to/root'
+        assert config.dep_depth_max == 5
+        assert config.verbose is True
+        assert config.sig_only is False
+        assert config.sig_tokens is None
 
-    def test_parse_multiple_roots(self, tmp_path):
-        """Test parsing config with multiple root paths."""
+    def test_parse_config_file_keeps_unknown_keys(self, tmp_path):
+        """Test that keys without a config attribute are kept in extra."""
         config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_file.write_text("verbose = true\nsig_detailed = true\n")
+
+        config = parse_config_file(str(config_file))
+
+        assert config.extra == {'sig_detailed': True}
+        assert config.as_dict() == {'verbose': True, 'sig_detailed': True}
+
+    def test_config_mapping_access(self):
+        """Test that a config reads like a dict of the keys present in the file."""
+        config = CCCConfig.from_dict({'root': ['/a', '/b'], 'sig_only': False, 'another': 1})
+
+        assert config['root'] == ['/a', '/b']
+        assert 'sig_only' in config
+        assert 'verbose' not in config
+        assert config.get('verbose') is None
+        assert len(config) == 3
+        with pytest.raises(KeyError):
+            config['output']
+        with pytest.raises(AttributeError):
+            config.unknown = 1
+
+    def test_parse_config_stream_values(self):
+        """Test parsing the values a discovered .ccc.conf would hold."""
+        config = _parse_config_stream(io.StringIO("root = /r\ndep_depth_max = 1\nverbose = false\n"))
+
+        assert config == {'root': '/r', 'dep_depth_max': 1, 'verbose': False}
+
+    def test_parse_multiple_roots(self):
+        """Test parsing config with multiple root paths."""
+        config_text = """
 root = /path/to/module1
 root = /path/to/module2
 root = /path/to/module3
-        """)
+        """
 
-        config = parse_config_file(str(config_file))
+        config = _parse_config_stream(io.StringIO(config_text))
 
         assert isinstance(config['root'], list)
         assert len(config['root']) == 3
         assert config['root'] == ['/path/to/module1', '/path/to/module2', '/path/to/module3']
 
-    def test_parse_empty_lines_and_comments(self, tmp_path):
+    def test_parse_empty_lines_and_comments(self):
         """Test that empty lines and comments are ignored."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
 # This is a comment
 
 root = /path/to/root
@@ -61,96 +94,114 @@ root = /path/to/root
 # Another comment
 dep_depth_max = 5
 
-        """)
+        """
 
-        config = parse_config_file(str(config_file))
+        config = _parse_config_stream(io.StringIO(config_text))
 
         assert len(config) == 2
         assert config['root'] == '/path/to/root'
         assert config['dep_depth_max'] == 5
 
-    def test_parse_boolean_values(self, tmp_path):
+    def test_parse_boolean_values(self):
         """Test parsing of boolean values."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
 verbose = true
 sig_only = false
 sig_detailed = True
 another = False
-        """)
+        """
 
-        config = parse_config_file(str(config_file))
+        config = _parse_config_stream(io.StringIO(config_text))
 
         assert config['verbose'] is True
         assert config['sig_only'] is False
         assert config['sig_detailed'] is True
         assert config['another'] is False
 
-    def test_parse_integer_values(self, tmp_path):
+    def test_parse_integer_values(self):
         """Test parsing of integer values."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
 dep_depth_max = 3
 sig_tokens = 4000
-        """)
+        """
 
-        config = parse_config_file(str(config_file))
+        config = _parse_config_stream(io.StringIO(config_text))
 
         assert config['dep_depth_max'] == 3
         assert config['sig_tokens'] == 4000
         assert isinstance(config['dep_depth_max'], int)
         assert isinstance(config['sig_tokens'], int)
 
-    def test_parse_string_values(self, tmp_path):
+    def test_parse_string_values(self):
         """Test parsing of string values."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
 output = /path/to/output.md
 find_by = find . -name '*.py'
-        """)
+        """
 
-        config = parse_config_file(str(config_file))
+        config = _parse_config_stream(io.StringIO(config_text))
 
         assert config['output'] == '/path/to/output.md'
         assert config['find_by'] == "find . -name '*.py'"
 
-    def test_parse_whitespace_handling(self, tmp_path):
+    def test_parse_whitespace_handling(self):
         """Test that whitespace is properly handled."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
   root   =   /path/to/root
 dep_depth_max=5
-        """)
+        """
 
-        config = parse_config_file(str(config_file))
+        config = _parse_config_stream(io.StringIO(config_text))
 
         assert config['root'] == '/path/to/root'
         assert config['dep_depth_max'] == 5
 
+    def test_parse_config_file_cached(self, tmp_path):
+        """Test that an unchanged config file is not read again."""
+        config_file = tmp_path / ".ccc.conf"
+        config_file.write_text("root = /path/to/module1\nroot = /path/to/module2\n")
+
+        first = parse_config_file(str(config_file))
+        first['root'].append('/modified/by/caller')
+
+        with patch('builtins.open') as mock_open:
+            second = parse_config_file(str(config_file))
+
+        mock_open.assert_not_called()
+        assert second == {'root': ['/path/to/module1', '/path/to/module2']}
+
+    def test_parse_config_file_reparsed_after_change(self, tmp_path):
+        """Test that a modified config file is parsed again."""
+        config_file = tmp_path / ".ccc.conf"
+        config_file.write_text("dep_depth_max = 1\n")
+        assert parse_config_file(str(config_file)) == {'dep_depth_max': 1}
+
+        config_file.write_text("dep_depth_max = 22\n")
+
+        assert parse_config_file(str(config_file)) == {'dep_depth_max': 22}
+
     def test_parse_nonexistent_file(self):
         """Test that FileNotFoundError is raised for non-existent files."""
         with pytest.raises(FileNotFoundError):
             parse_config_file('/nonexistent/path/.ccc.conf')
 
-    def test_parse_invalid_format_no_equals(self, tmp_path):
+    def test_parse_invalid_format_no_equals(self):
         """Test that ValueError is raised for invalid format."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
 root /path/to/root
-        """)
+        """
 
         with pytest.raises(ValueError, match="Invalid config format"):
-            parse_config_file(str(config_file))
+            _parse_config_stream(io.StringIO(config_text))
 
-    def test_parse_empty_key(self, tmp_path):
+    def test_parse_empty_key(self):
         """Test that ValueError is raised for empty keys."""
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text("""
+        config_text = """
  = value
-        """)
+        """
 
         with pytest.raises(ValueError, match="Empty key"):
-            parse_config_file(str(config_file))
+            _parse_config_stream(io.StringIO(config_text))
 
 
 class TestApplyConfigDefaults:
@@ -305,6 +356,36 @@ class TestValidateConfig:
         with pytest.raises(ValueError, match="Root path does not exist"):
             validate_config(config)
 
+    @pytest.mark.parametrize("root", [1, [None, "src"]])
+    def test_validate_non_path_root(self, root):
+        """Test that validation fails for roots that are not path strings."""
+        config = {
+            'root': root
+        }
+
+        with pytest.raises(ValueError, match="root must be a path"):
+            validate_config(config)
+
+    def test_validate_duplicate_roots_stat_once(self, tmp_path, monkeypatch):
+        """Test that a root listed several times is only checked once."""
+        root = tmp_path / "src"
+        root.mkdir()
+        config = {
+            'root': [str(root), str(root), str(root / ".." / "src")]
+        }
+
+        stat_calls = []
+        real_stat = os.stat
+
+        def counting_stat(path, *args, **kwargs):
+            stat_calls.append(path)
+            return real_stat(path, *args, **kwargs)
+
+        monkeypatch.setattr(os, "stat", counting_stat)
+        validate_config(config)
+
+        assert stat_calls == [str(root)]
+
     def test_validate_negative_dep_depth_max(self):
         """Test that validation fails for negative dep_depth_max."""
         config = {
@@ -341,6 +422,15 @@ class TestValidateConfig:
         with pytest.raises(ValueError, match="dep_depth_max must be a positive integer"):
             validate_config(config)
 
+    def test_validate_boolean_sig_tokens(self):
+        """Test that validation fails for a boolean where an integer is expected."""
+        config = {
+            'sig_tokens': True
+        }
+
+        with pytest.raises(ValueError, match="sig_tokens must be a positive integer"):
+            validate_config(config)
+
 
 class TestGetDefaultValue:
     """Test getting default values for arguments."""
@@ -4,207 +4,153 @@ Tests the entire pipeline from CLI invocation to output generation.
 """
 
 import pytest
-import os
+import re
+import subprocess
 import sys
-import tempfile
-from pathlib import Path
-from unittest.mock import patch
-from io import StringIO
 
-from codecontextcrafter.code_context_crafter import ccc, main
+from codecontextcrafter.code_context_crafter import ccc, main, _run
 
 
-class TestEndToEnd:
-    """End-to-end tests that exercise the complete ccc() workflow."""
+# Tiny Python source written by the tests that need a single input file
+_STUB_PY = b"def test():\n    pass\n"
 
-    def test_simple_file_to_stdout(self, tmp_path, capsys, monkeypatch):
-        """Test processing a single file with output to stdout."""
-        # Create a simple test file
-        test_file = tmp_path / "simple.py"
-        test_file.write_text("def hello():\n    return 'world'\n")
+# Small project shared by the tests that only read their input files
+SAMPLE_PROJECT = {
+    "simple.py": "def hello():\n    return 'world'\n",
+    "test.py": _STUB_PY.decode(),
+    "file1.py": "def func1():\n    pass\n",
+    "file2.py": "def func2():\n    pass\n",
+    "file3.py": "def func3():\n    pass\n",
+}
 
-        # Mock sys.argv
-        test_args = ['ccc', str(test_file)]
-        monkeypatch.chdir(tmp_path)
 
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+def _found(text, needles):
+    """
+    Find which of the given substrings occur in text, scanning it once.
 
-        captured = capsys.readouterr()
+    The needles must not overlap each other in text.
+    """
+    pattern = re.compile("|".join(map(re.escape, needles)))
+    return set(pattern.findall(text))
 
-        # Verify output contains the file content
-        assert "def hello():" in captured.out
-        assert "return 'world'" in captured.out
-        assert "# Context" in captured.out
 
-    def test_file_with_output_file(self, tmp_path, monkeypatch):
-        """Test processing a file with output to a file."""
-        # Create test file
-        test_file = tmp_path / "test.py"
-        test_file.write_text("import os\n\ndef main():\n    pass\n")
+class TestEndToEnd:
+    """End-to-end tests that exercise the complete ccc() workflow."""
 
-        output_file = tmp_path / "output.md"
+    def test_simple_file_to_stdout(self, ccc_runner):
+        """Test processing a single file with output to stdout."""
+        result = ccc_runner(['{root}/simple.py'], SAMPLE_PROJECT)
 
-        # Mock sys.argv
-        test_args = ['ccc', str(test_file), '--output', str(output_file)]
-        monkeypatch.chdir(tmp_path)
+        # Verify output contains the file content
+        expected = {"def hello():", "return 'world'", "# Context"}
+        assert _found(result.stdout, expected) == expected
 
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+    def test_file_with_output_file(self, ccc_runner):
+        """Test processing a file with output to a file."""
+        result = ccc_runner(
+            ['{root}/test.py', '--output', '{output}'],
+            {"test.py": "import os\n\ndef main():\n    pass\n"}
+        )
 
         # Verify output file was created
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "def main():" in content
-        assert "# Context" in content
+        assert result.output is not None
+        assert "def main():" in result.output
+        assert "# Context" in result.output
 
-    def test_with_dependencies_and_depth(self, tmp_path, monkeypatch):
+    @pytest.mark.slow
+    def test_with_dependencies_and_depth(self, ccc_runner):
         """Test dependency resolution with depth limiting."""
         # Create a dependency chain
-        utils = tmp_path / "utils.py"
-        utils.write_text("def util_func():\n    pass\n")
+        files = {
+            "utils.py": "def util_func():\n    pass\n",
+            "main.py": "from utils import util_func\n\ndef main():\n    util_func()\n",
+        }
 
-        main_file = tmp_path / "main.py"
-        main_file.write_text("from utils import util_func\n\ndef main():\n    util_func()\n")
-
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv with depth limit and root
-        test_args = [
-            'ccc',
-            str(main_file),
-            '--root', str(tmp_path),
-            '--dep-depth-max', '1',
-            '--output', str(output_file)
-        ]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        result = ccc_runner(
+            ['{root}/main.py', '--root', '{root}', '--dep-depth-max', '1', '--output', '{output}'],
+            files
+        )
 
         # Verify output file contains both primary and dependencies
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "main.py" in content
-        assert "## Dependencies (Signatures)" in content
+        assert result.output is not None
+        assert "main.py" in result.output
+        assert "## Dependencies (Signatures)" in result.output
 
-    def test_sig_only_mode(self, tmp_path, monkeypatch):
+    def test_sig_only_mode(self, ccc_runner):
         """Test signature-only mode."""
-        # Create test files
-        file1 = tmp_path / "file1.py"
-        file1.write_text("def func1():\n    pass\n")
-
-        file2 = tmp_path / "file2.py"
-        file2.write_text("def func2():\n    pass\n")
-
-        output_file = tmp_path / "signatures.md"
-
-        # Mock sys.argv for sig-only mode
-        test_args = [
-            'ccc',
-            str(file1),
-            str(file2),
-            '--sig-only',
-            '--output', str(output_file)
-        ]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        result = ccc_runner(['{root}/file1.py', '{root}/file2.py', '--sig-only', '--output', '{output}'], SAMPLE_PROJECT)
 
         # Verify output contains signatures
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "## File Signatures" in content
+        assert result.output is not None
+        assert "## File Signatures" in result.output
         # Should NOT have primary files section
-        assert "Primary Files" not in content
+        assert "Primary Files" not in result.output
 
-    def test_with_config_file(self, tmp_path, monkeypatch):
+    @pytest.mark.slow
+    def test_with_config_file(self, ccc_runner):
         """Test with automatic config file discovery."""
-        # Create config file
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text(f"""
-root = {tmp_path}
-dep_depth_max = 2
-sig_tokens = 2000
-        """)
+        files = {
+            ".ccc.conf": "\nroot = {root}\ndep_depth_max = 2\nsig_tokens = 2000\n",
+            "dependency.py": "def dep_func():\n    pass\n",
+            "main.py": "from dependency import dep_func\n",
+        }
 
-        # Create test files
-        dep = tmp_path / "dependency.py"
-        dep.write_text("def dep_func():\n    pass\n")
+        # Config should be auto-discovered in the working directory
+        result = ccc_runner(['{root}/main.py', '--output', '{output}'], files)
 
-        main_file = tmp_path / "main.py"
-        main_file.write_text("from dependency import dep_func\n")
+        # Verify config was used (dependencies should be found)
+        assert result.output is not None
+        assert "## Dependencies (Signatures)" in result.output
 
-        output_file = tmp_path / "output.md"
+    def test_explicit_config_file(self, ccc_runner):
+        """Test with explicitly specified config file."""
+        files = {
+            "my-config.conf": "\nroot = {root}\ndep_depth_max = 1\n",
+            "test.py": "import os\n",
+        }
 
-        # Change to directory with config file
-        monkeypatch.chdir(tmp_path)
+        result = ccc_runner(['{root}/test.py', '--config', '{root}/my-config.conf', '--output', '{output}'], files)
 
-        # Mock sys.argv - config should be auto-discovered
-        test_args = ['ccc', str(main_file), '--output', str(output_file)]
+        # Should complete without error
+        assert result.output is not None
 
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+    def test_verbose_mode(self, ccc_runner):
+        """Test the verbose messages of a run with a discovered config and no --sig-tokens."""
+        files = {"test.py": SAMPLE_PROJECT["test.py"], ".ccc.conf": "root = {root}\n"}
 
-        # Verify config was used (dependencies should be found)
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "## Dependencies (Signatures)" in content
+        result = ccc_runner(['{root}/test.py', '--sig-only', '--verbose'], files)
 
-    def test_explicit_config_file(self, tmp_path, monkeypatch):
-        """Test with explicitly specified config file."""
-        # Create config file with custom name
-        config_file = tmp_path / "my-config.conf"
-        config_file.write_text(f"""
-root = {tmp_path}
-dep_depth_max = 1
-        """)
+        # Verify progress, config loading and signature detail messages appear
+        assert "Processing" in result.stdout or "Generating" in result.stdout
+        assert "Loaded configuration from" in result.stdout
+        assert "maximum detail signatures" in result.stdout
 
-        # Create test file
+    def test_run_with_namespace(self, parser, make_args, tmp_path):
+        """Test running the workflow on a prebuilt namespace, without argv or argparse."""
         test_file = tmp_path / "test.py"
-        test_file.write_text("import os\n")
-
+        test_file.write_bytes(_STUB_PY)
         output_file = tmp_path / "output.md"
 
-        # Mock sys.argv with explicit config
-        test_args = [
-            'ccc',
-            str(test_file),
-            '--config', str(config_file),
-            '--output', str(output_file)
-        ]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        _run(make_args(files=[str(test_file)], output=str(output_file)), parser)
 
-        # Should complete without error
-        assert output_file.exists()
+        assert "def test():" in output_file.read_text()
 
-    def test_verbose_mode(self, tmp_path, capsys, monkeypatch):
-        """Test verbose output mode."""
-        # Create test file
+    def test_ccc_with_argv(self, tmp_path, monkeypatch):
+        """Test that ccc() parses an explicit argument list instead of sys.argv."""
         test_file = tmp_path / "test.py"
-        test_file.write_text("def test():\n    pass\n")
-
-        # Mock sys.argv with verbose flag
-        test_args = ['ccc', str(test_file), '--verbose']
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        test_file.write_bytes(_STUB_PY)
+        output_file = tmp_path / "output.md"
+        monkeypatch.setattr(sys, "argv", ['ccc', '--bogus-option'])
 
-        captured = capsys.readouterr()
+        ccc([str(test_file), '--output', str(output_file)])
 
-        # Verify verbose messages appear
-        assert "Processing" in captured.out or "Generating" in captured.out
+        assert "def test():" in output_file.read_text()
 
     def test_invalid_config_file_exits(self, tmp_path, monkeypatch):
         """Test that invalid config file causes exit."""
         # Create test file
         test_file = tmp_path / "test.py"
-        test_file.write_text("def test():\n    pass\n")
+        test_file.write_bytes(_STUB_PY)
 
         # Mock sys.argv with non-existent config
         test_args = [
@@ -212,280 +158,77 @@ dep_depth_max = 1
             str(test_file),
             '--config', '/nonexistent/config.conf'
         ]
-        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "argv", test_args)
 
-        with patch.object(sys, 'argv', test_args):
-            with pytest.raises(SystemExit):
-                ccc()
+        with pytest.raises(SystemExit):
+            ccc()
 
-    def test_multiple_files(self, tmp_path, monkeypatch):
+    def test_multiple_files(self, fs_project):
         """Test processing multiple files at once."""
-        # Create multiple test files
-        file1 = tmp_path / "file1.py"
-        file1.write_text("def func1():\n    pass\n")
-
-        file2 = tmp_path / "file2.py"
-        file2.write_text("def func2():\n    pass\n")
-
-        file3 = tmp_path / "file3.py"
-        file3.write_text("def func3():\n    pass\n")
-
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv with multiple files
-        test_args = [
-            'ccc',
-            str(file1),
-            str(file2),
-            str(file3),
-            '--output', str(output_file)
-        ]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        result = fs_project(
+            ['{root}/file1.py', '{root}/file2.py', '{root}/file3.py', '--output', '{output}'],
+            SAMPLE_PROJECT
+        )
 
         # Verify all files are in output
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "func1" in content
-        assert "func2" in content
-        assert "func3" in content
+        assert result.output is not None
+        expected = {"func1", "func2", "func3"}
+        assert _found(result.output, expected) == expected
 
-    def test_find_by_command(self, tmp_path, monkeypatch):
+    @pytest.mark.slow
+    def test_find_by_command(self, ccc_runner, monkeypatch):
         """Test file discovery via --find-by command."""
-        # Create test files
-        (tmp_path / "test1.py").write_text("# test1")
-        (tmp_path / "test2.py").write_text("# test2")
-        (tmp_path / "ignored.txt").write_text("# ignored")
+        files = {
+            "test1.py": "# test1",
+            "test2.py": "# test2",
+            "ignored.txt": "# ignored",
+        }
 
-        output_file = tmp_path / "output.md"
+        def fail_run(*args, **kwargs):
+            raise AssertionError("find was run in a subprocess")
 
-        # Mock sys.argv with find-by command
-        find_cmd = f"find {tmp_path} -name '*.py'"
-        test_args = [
-            'ccc',
-            '--find-by', find_cmd,
-            '--sig-only',
-            '--output', str(output_file)
-        ]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        # A plain find by extension is walked in-process, without forking find
+        monkeypatch.setattr(subprocess, "run", fail_run)
+        result = ccc_runner(['--find-by', "find {root} -name '*.py'", '--sig-only', '--output', '{output}'], files)
 
         # Verify Python files were found and processed
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "test1.py" in content or "test2.py" in content
+        assert result.output is not None
+        assert "test1.py" in result.output or "test2.py" in result.output
 
-    def test_multi_module_with_config(self, tmp_path, monkeypatch):
+    @pytest.mark.slow
+    def test_multi_module_with_config(self, ccc_runner):
         """Test multi-module project with config file."""
-        # Create multi-module structure
-        module1 = tmp_path / "module1"
-        module2 = tmp_path / "module2"
-        module1.mkdir()
-        module2.mkdir()
-
-        # Create files in different modules
-        utils = module1 / "utils.py"
-        utils.write_text("def util_func():\n    pass\n")
-
-        helpers = module2 / "helpers.py"
-        helpers.write_text("def helper_func():\n    pass\n")
-
-        main_file = tmp_path / "main.py"
-        main_file.write_text("""
-from utils import util_func
-from helpers import helper_func
-        """)
-
-        # Create config with multiple roots
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text(f"""
-root = {module1}
-root = {module2}
-dep_depth_max = 1
-        """)
-
-        output_file = tmp_path / "output.md"
+        files = {
+            "module1/utils.py": "def util_func():\n    pass\n",
+            "module2/helpers.py": "def helper_func():\n    pass\n",
+            "main.py": "\nfrom utils import util_func\nfrom helpers import helper_func\n",
+            # Config with multiple roots
+            ".ccc.conf": "\nroot = {root}/module1\nroot = {root}/module2\ndep_depth_max = 1\n",
+        }
 
-        # Change to directory with config
-        monkeypatch.chdir(tmp_path)
-
-        # Mock sys.argv
-        test_args = ['ccc', str(main_file), '--output', str(output_file)]
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
+        result = ccc_runner(['{root}/main.py', '--output', '{output}'], files)
 
         # Verify both modules' dependencies were found
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "## Dependencies (Signatures)" in content
-
-    def test_javascript_file_language_detection(self, tmp_path, monkeypatch):
-        """Test that JavaScript files are properly detected and formatted."""
-        # Create JavaScript file
-        js_file = tmp_path / "app.js"
-        js_file.write_text("function hello() {\n  return 'world';\n}\n")
+        assert result.output is not None
+        assert "## Dependencies (Signatures)" in result.output
 
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv
-        test_args = ['ccc', str(js_file), '--output', str(output_file)]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        # Verify JavaScript code block
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "```javascript" in content
-        assert "function hello()" in content
-
-    def test_typescript_file_language_detection(self, tmp_path, monkeypatch):
-        """Test that TypeScript files are properly detected and formatted."""
-        # Create TypeScript file
-        ts_file = tmp_path / "app.ts"
-        ts_file.write_text("function greet(name: string): string {\n  return `Hello ${name}`;\n}\n")
-
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv
-        test_args = ['ccc', str(ts_file), '--output', str(output_file)]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        # Verify TypeScript code block
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "```typescript" in content
-        assert "function greet" in content
-
-    def test_java_file_language_detection(self, tmp_path, monkeypatch):
-        """Test that Java files are properly detected and formatted."""
-        # Create Java file
-        java_file = tmp_path / "Main.java"
-        java_file.write_text("public class Main {\n  public static void main(String[] args) {}\n}\n")
-
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv
-        test_args = ['ccc', str(java_file), '--output', str(output_file)]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        # Verify Java code block
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "```java" in content
-        assert "public class Main" in content
-
-    def test_main_function(self, tmp_path, capsys, monkeypatch):
+    def test_main_function(self, ccc_runner):
         """Test the main() entry point function."""
-        # Create simple test file
-        test_file = tmp_path / "test.py"
-        test_file.write_text("def test():\n    pass\n")
-
-        # Mock sys.argv
-        test_args = ['ccc', str(test_file)]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            main()
-
-        captured = capsys.readouterr()
+        result = ccc_runner(['{root}/test.py'], SAMPLE_PROJECT, entry=main)
 
         # Verify main() prints the banner and calls ccc()
-        assert "CodeContextCrafter is running!" in captured.out
-        assert "def test():" in captured.out
-
-    def test_config_verbose_message(self, tmp_path, capsys, monkeypatch):
-        """Test that verbose mode shows config loading message."""
-        # Create config file
-        config_file = tmp_path / ".ccc.conf"
-        config_file.write_text(f"root = {tmp_path}\n")
-
-        # Create test file
-        test_file = tmp_path / "test.py"
-        test_file.write_text("def test():\n    pass\n")
-
-        # Change to directory with config
-        monkeypatch.chdir(tmp_path)
-
-        # Mock sys.argv with verbose
-        test_args = ['ccc', str(test_file), '--verbose']
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        captured = capsys.readouterr()
-
-        # Verify config loading message appears
-        assert "Loaded configuration from" in captured.out
-
-    def test_sig_tokens_none_verbose_message(self, tmp_path, capsys, monkeypatch):
-        """Test verbose message when sig_tokens is not specified."""
-        # Create test file
-        test_file = tmp_path / "test.py"
-        test_file.write_text("def test():\n    pass\n")
-
-        # Mock sys.argv with verbose but no sig-tokens
-        test_args = ['ccc', str(test_file), '--sig-only', '--verbose']
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        captured = capsys.readouterr()
-
-        # Verify message about maximum detail signatures
-        assert "maximum detail signatures" in captured.out
-
-    def test_cpp_file_language_detection(self, tmp_path, monkeypatch):
-        """Test that C/C++ files are properly detected and formatted."""
-        # Create C++ file
-        cpp_file = tmp_path / "main.cpp"
-        cpp_file.write_text("#include <iostream>\n\nint main() {\n  return 0;\n}\n")
-
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv
-        test_args = ['ccc', str(cpp_file), '--output', str(output_file)]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        # Verify C++ code block
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "```cpp" in content
-        assert "#include <iostream>" in content
-
-    def test_c_header_file_language_detection(self, tmp_path, monkeypatch):
-        """Test that C header files are properly detected and formatted."""
-        # Create C header file
-        h_file = tmp_path / "header.h"
-        h_file.write_text("#ifndef HEADER_H\n#define HEADER_H\n\nvoid func();\n\n#endif\n")
-
-        output_file = tmp_path / "output.md"
-
-        # Mock sys.argv
-        test_args = ['ccc', str(h_file), '--output', str(output_file)]
-        monkeypatch.chdir(tmp_path)
-
-        with patch.object(sys, 'argv', test_args):
-            ccc()
-
-        # Verify C/C++ code block for header
-        assert output_file.exists()
-        content = output_file.read_text()
-        assert "```cpp" in content
-        assert "#ifndef HEADER_H" in content
+        assert "CodeContextCrafter is running!" in result.stdout
+        assert "def test():" in result.stdout
+
+    @pytest.mark.parametrize("name,body,fence", [
+        ("app.js", "function hello() {\n  return 'world';\n}\n", "```javascript"),
+        ("app.ts", "function greet(name: string): string {\n  return `Hello ${name}`;\n}\n", "```typescript"),
+        ("Main.java", "public class Main {\n  public static void main(String[] args) {}\n}\n", "```java"),
+        ("main.cpp", "#include <iostream>\n\nint main() {\n  return 0;\n}\n", "```cpp"),
+        ("header.h", "#ifndef HEADER_H\n#define HEADER_H\n\nvoid func();\n\n#endif\n", "```cpp"),
+    ])
+    def test_language_detection(self, fs_project, name, body, fence):
+        """Test that each source language gets its code block and content in the output."""
+        result = fs_project([f'{{root}}/{name}', '--output', '{output}'], {name: body})
+
+        assert f"{fence}\n{body}" in result.output
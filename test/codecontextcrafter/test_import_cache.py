@@ -0,0 +1,183 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from codecontextcrafter.traverser.import_cache import ImportCache, default_import_cache_path
+from codecontextcrafter.traverser.traverse_dependencies import traverse_dependencies
+
+
+class TestImportCache:
+    """Test the on-disk import cache."""
+
+    def test_get_missing_entry(self, tmp_path):
+        """Test that unknown paths are not found."""
+        cache = ImportCache(str(tmp_path / "cache" / "imports.sqlite3"))
+
+        assert cache.get("/no/such/file.py") is None
+
+    def test_put_and_get(self, tmp_path):
+        """Test that stored entries are read back unchanged."""
+        cache = ImportCache(str(tmp_path / "imports.sqlite3"))
+        cache.put("/src/main.py", 123, 45, b"digest", frozenset({"os", "./utils"}))
+
+        entry = cache.get("/src/main.py")
+
+        assert entry.mtime_ns == 123
+        assert entry.size == 45
+        assert entry.sha1 == b"digest"
+        assert entry.imports == frozenset({"os", "./utils"})
+
+    def test_put_replaces_entry(self, tmp_path):
+        """Test that storing a path again overwrites the previous entry."""
+        cache = ImportCache(str(tmp_path / "imports.sqlite3"))
+        cache.put("/src/main.py", 1, 1, b"old", frozenset({"old"}))
+        cache.put("/src/main.py", 2, 2, b"new", frozenset())
+
+        entry = cache.get("/src/main.py")
+
+        assert entry.sha1 == b"new"
+        assert entry.imports == frozenset()
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that entries survive reopening the database."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        with ImportCache(db_path) as cache:
+            cache.put("/src/main.py", 1, 1, b"x", frozenset({"os"}))
+
+        assert ImportCache(db_path).get("/src/main.py").imports == frozenset({"os"})
+
+    def test_entries_written_on_flush(self, tmp_path):
+        """Test that stored entries are buffered until flushed, then all written."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        cache = ImportCache(db_path)
+        cache.put("/src/a.py", 1, 1, b"a", frozenset({"os"}))
+        cache.put("/src/b.py", 2, 2, b"b", frozenset())
+
+        assert ImportCache(db_path).get("/src/a.py") is None
+
+        cache.flush()
+
+        reader = ImportCache(db_path)
+        assert reader.get("/src/a.py").imports == frozenset({"os"})
+        assert reader.get("/src/b.py").sha1 == b"b"
+
+    def test_shared_between_threads(self, tmp_path):
+        """Test that entries stored by one thread are read by another."""
+        with ImportCache(str(tmp_path / "imports.sqlite3")) as cache:
+            cache.put("/src/main.py", 1, 1, b"x", frozenset({"os"}))
+            cache.flush()
+            found = []
+            thread = threading.Thread(target=lambda: found.append(cache.get("/src/main.py")))
+            thread.start()
+            thread.join()
+
+        assert found[0].imports == frozenset({"os"})
+
+    def test_close_closes_connection(self, tmp_path):
+        """Test that close() writes pending entries and closes the connection."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        cache = ImportCache(db_path)
+        cache.put("/src/main.py", 1, 1, b"x", frozenset({"os"}))
+
+        cache.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            cache.get("/src/other.py")
+        assert ImportCache(db_path).get("/src/main.py").imports == frozenset({"os"})
+
+    @pytest.mark.parametrize("cache_home, expected", [
+        ("/xdg/cache", "/xdg/cache/ccc/imports.sqlite3"),
+        ("relative/cache", "{home}/.cache/ccc/imports.sqlite3"),
+        ("", "{home}/.cache/ccc/imports.sqlite3"),
+    ], ids=["absolute", "relative", "empty"])
+    def test_default_path_follows_xdg_cache_home(self, monkeypatch, tmp_path, cache_home, expected):
+        """Test that the default location honours an absolute $XDG_CACHE_HOME."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("XDG_CACHE_HOME", cache_home)
+
+        assert default_import_cache_path() == expected.format(home=tmp_path)
+
+
+class TestTraverseWithImportCache:
+    """Test traverse_dependencies with an on-disk import cache."""
+
+    def test_populates_cache(self, tmp_path):
+        """Test that scanned files are stored in the cache."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        dep = tmp_path / "dep.py"
+        dep.write_text("def func(): pass")
+        main = tmp_path / "main.py"
+        main.write_text("from dep import func")
+
+        result = traverse_dependencies(str(main), str(tmp_path), import_cache=db_path)
+
+        assert result == [str(dep.resolve())]
+        cache = ImportCache(db_path)
+        assert cache.get(str(main.resolve())).imports == frozenset({"dep"})
+        assert cache.get(str(dep.resolve())).imports == frozenset()
+
+    def test_unchanged_file_not_rescanned(self, tmp_path):
+        """Test that an entry matching mtime and size is used as is."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        other = tmp_path / "other.py"
+        other.write_text("def func(): pass")
+        main = tmp_path / "main.py"
+        main.write_text("import os")
+
+        stat = os.stat(main)
+        with ImportCache(db_path) as cache:
+            cache.put(str(main.resolve()), stat.st_mtime_ns, stat.st_size, b"", frozenset({"other"}))
+
+        result = traverse_dependencies(str(main), str(tmp_path), import_cache=db_path)
+
+        assert result == [str(other.resolve())]
+
+    def test_touched_file_with_same_content_reuses_entry(self, tmp_path):
+        """Test that a file with a new mtime but the same content hash is not rescanned."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        other = tmp_path / "other.py"
+        other.write_text("def func(): pass")
+        main = tmp_path / "main.py"
+        main.write_text("import os")
+
+        sha1 = hashlib.sha1(main.read_bytes()).digest()
+        with ImportCache(db_path) as cache:
+            cache.put(str(main.resolve()), 0, 0, sha1, frozenset({"other"}))
+
+        result = traverse_dependencies(str(main), str(tmp_path), import_cache=db_path)
+
+        assert result == [str(other.resolve())]
+        assert ImportCache(db_path).get(str(main.resolve())).mtime_ns == os.stat(main).st_mtime_ns
+
+    def test_changed_file_rescanned(self, tmp_path):
+        """Test that a file whose content changed is scanned again."""
+        db_path = str(tmp_path / "imports.sqlite3")
+        dep = tmp_path / "dep.py"
+        dep.write_text("def func(): pass")
+        main = tmp_path / "main.py"
+        main.write_text("from dep import func")
+
+        with ImportCache(db_path) as cache:
+            cache.put(str(main.resolve()), 0, 0, b"stale", frozenset({"other"}))
+
+        result = traverse_dependencies(str(main), str(tmp_path), import_cache=db_path)
+
+        assert result == [str(dep.resolve())]
+
+    def test_open_cache_shared_between_traversals(self, tmp_path):
+        """Test that an open cache is used, but left open, by each traversal."""
+        dep = tmp_path / "dep.py"
+        dep.write_text("def func(): pass")
+        mains = []
+        for name in ("a.py", "b.py"):
+            main = tmp_path / name
+            main.write_text("from dep import func")
+            mains.append(main)
+
+        with ImportCache(str(tmp_path / "imports.sqlite3")) as cache:
+            for main in mains:
+                assert traverse_dependencies(str(main), str(tmp_path), import_cache=cache) == [str(dep.resolve())]
+            assert cache.get(str(mains[1].resolve())).imports == frozenset({"dep"})
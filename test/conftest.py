@@ -0,0 +1,201 @@
+import os
+import sys
+import pytest
+from argparse import Namespace
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from codecontextcrafter.code_context_crafter import _create_argument_parser, _TOKEN_COUNTS, ccc
+from codecontextcrafter.config_parser import _CONFIG_CACHE
+from codecontextcrafter.traverser.traverse_dependencies import clear_caches
+
+
+@pytest.fixture(scope="session")
+def parser():
+    """Argument parser shared by all tests; parse_args() does not modify it."""
+    return _create_argument_parser()
+
+
+# Values of the parsed CLI arguments when no option is given
+ARG_DEFAULTS = dict(
+    files=[], config=None, root=None, output=None, sig_tokens=None, find_by=None,
+    dep_depth_max=None, verbose=False, sig_only=False, sig_detailed=False, import_cache=False,
+)
+
+
+@pytest.fixture(scope="session")
+def make_args():
+    """Factory for parsed-argument namespaces: make_args(root=[...], dep_depth_max=1)."""
+    def _make_args(**overrides):
+        return Namespace(**{**ARG_DEFAULTS, 'files': [], **overrides})
+    return _make_args
+
+
+def _fast_write(path, text):
+    """Write a small UTF-8 file with a single os.write instead of Path.write_text."""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, text.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _build_tree(root, spec):
+    """
+    Write a tree of small files given as {relative path: content}.
+
+    Each distinct parent directory is created once, then every file is
+    written with _fast_write.
+    """
+    paths = {root / name: content for name, content in spec.items()}
+    for parent in {path.parent for path in paths}:
+        parent.mkdir(parents=True, exist_ok=True)
+    for path, content in paths.items():
+        _fast_write(path, content)
+
+
+@pytest.fixture(scope="session")
+def build_tree():
+    """The _build_tree helper: build_tree(root, {"pkg/mod.py": "..."})."""
+    return _build_tree
+
+
+def _shared_tree(tmp_path_factory, name, build):
+    """
+    Build a read-only directory once per test run, even across xdist workers.
+
+    Each worker builds into its own directory and renames it into place under
+    the run's shared temp root; a worker that loses the race uses the winner's.
+    """
+    if "PYTEST_XDIST_WORKER" not in os.environ:
+        root = tmp_path_factory.mktemp(name)
+        build(root)
+        return root
+
+    shared = tmp_path_factory.getbasetemp().parent / name
+    if not shared.is_dir():
+        staging = tmp_path_factory.mktemp(name)
+        build(staging)
+        try:
+            os.rename(staging, shared)
+        except OSError:
+            pass  # Another worker published it first
+    return shared
+
+
+def _build_sample_tree(root):
+    _fast_write(root / "main.py", "from dep import func")
+    _fast_write(root / "dep.py", "def func(): pass")
+    _fast_write(root / "file1.py", "# file1 content")
+    _fast_write(root / "file2.py", "# file2 content")
+    _fast_write(root / "utils.py", "def helper(): pass")
+    _fast_write(root / "config.py", "VERSION = 1")
+
+
+@pytest.fixture(scope="session")
+def sample_tree(tmp_path_factory):
+    """
+    Small source tree shared by all tests of a run.
+
+    Tests must treat it as read-only; tests that write files use tmp_path.
+    """
+    return _shared_tree(tmp_path_factory, "sample_tree", _build_sample_tree)
+
+
+class CCCRun(NamedTuple):
+    """Captured result of one ccc invocation."""
+    stdout: str
+    output: Optional[str]
+
+
+def _run_ccc(root, args, entry, chdir):
+    """
+    Run entry() on a project directory and capture its results.
+
+    '{root}' in args is replaced by root and '{output}' by root/output.md,
+    which is removed first so an earlier run's output cannot leak in.
+    With chdir, root is the working directory during the run.
+    """
+    output_file = root / "output.md"
+    output_file.unlink(missing_ok=True)
+
+    argv = ['ccc'] + [a.replace("{root}", str(root)).replace("{output}", str(output_file)) for a in args]
+    stdout = StringIO()
+    cwd, saved_argv = os.getcwd(), sys.argv
+    if chdir:
+        os.chdir(root)
+    sys.argv = argv
+    try:
+        with redirect_stdout(stdout):
+            entry()
+    finally:
+        sys.argv = saved_argv
+        if chdir:
+            os.chdir(cwd)
+
+    output = output_file.read_text(encoding='utf-8') if output_file.exists() else None
+    return CCCRun(stdout.getvalue(), output)
+
+
+@pytest.fixture(scope="session")
+def ccc_runner(tmp_path_factory):
+    """
+    Run the CLI on a small project and cache the result per input.
+
+    Call run(args, files) where files maps relative paths to their content.
+    The files are written once per distinct files dict to a directory shared
+    by every run on them. Runs must not modify the files. If the files
+    include a '.ccc.conf', the directory is the working directory during the
+    run so the config is discovered; other runs only use absolute paths.
+    '{root}' in args and file contents is replaced by that directory and
+    '{output}' in args by an output file inside it. The same (args, files,
+    entry) returns the cached CCCRun without running the CLI again.
+    """
+    projects = {}
+    results = {}
+
+    def run(args, files, entry=ccc):
+        project_key = frozenset(files.items())
+        key = (tuple(args), project_key, entry)
+        if key not in results:
+            root = projects.get(project_key)
+            if root is None:
+                root = projects[project_key] = tmp_path_factory.mktemp("project")
+                _build_tree(root, {name: content.replace("{root}", str(root)) for name, content in files.items()})
+            results[key] = _run_ccc(root, args, entry, chdir=".ccc.conf" in files)
+        return results[key]
+
+    return run
+
+
+@pytest.fixture
+def fs_project(request):
+    """
+    Run the CLI like ccc_runner, but on an in-memory pyfakefs filesystem.
+
+    For tests of output formatting that do not depend on disk semantics.
+    Runs are not cached. Signature generation needs the real tree-sitter
+    query files, so tests that produce signatures use ccc_runner instead.
+    """
+    # ccc imports these lazily; load them while the real filesystem is visible
+    import codecontextcrafter.aider.io  # noqa: F401
+    import codecontextcrafter.aider.repomap  # noqa: F401
+    request.getfixturevalue("fs")
+
+    def run(args, files, entry=ccc):
+        root = Path("/project")
+        _build_tree(root, {name: content.replace("{root}", str(root)) for name, content in files.items()})
+        return _run_ccc(root, args, entry, chdir=".ccc.conf" in files)
+
+    return run
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Drop in-process caches after every test so no state leaks between tests."""
+    yield
+    _CONFIG_CACHE.clear()
+    _TOKEN_COUNTS.clear()
+    clear_caches()